@@ -15,11 +15,17 @@ Requirements:
 """
 
 import time
-import subprocess
+import wave
+import threading
 import argparse
+from functools import lru_cache
 from pathlib import Path
 
-# Try to import DroidRig modules
+import numpy as np
+
+from droidrig.audio import AudioPlayer
+
+# Try to import DroidRig hardware modules
 try:
     from droidrig.hardware import ServoController
     from droidrig.servo_config import ServoConfigStore
@@ -29,53 +35,32 @@ except ImportError:
     print("⚠ Hardware modules not available - running in simulation mode")
 
 
-def create_test_beep(filepath: Path):
-    """Create a simple beep WAV file using sox or ffmpeg."""
+@lru_cache(maxsize=8)
+def beep_samples(freq: float = 880.0, duration: float = 0.1, rate: int = 44100) -> np.ndarray:
+    """Generate a mono 16-bit sine beep (cached per parameters)."""
+    t = np.arange(int(duration * rate)) / rate
+    samples = (0.5 * 32767 * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+    samples.flags.writeable = False  # Shared between callers via the cache
+    return samples
+
+
+def create_test_beep(filepath: Path, rate: int = 44100):
+    """Write a short 880Hz beep WAV, generated in-process."""
     if filepath.exists():
         return True
     
     print(f"Creating test beep file: {filepath}")
     
-    # Try sox first
-    try:
-        subprocess.run(
-            ['sox', '-n', str(filepath), 'synth', '0.1', 'sine', '880'],
-            check=True,
-            capture_output=True
-        )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        pass
-    
-    # Try ffmpeg
     try:
-        subprocess.run(
-            ['ffmpeg', '-y', '-f', 'lavfi', '-i', 
-             'sine=frequency=880:duration=0.1', str(filepath)],
-            check=True,
-            capture_output=True
-        )
+        with wave.open(str(filepath), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(beep_samples(rate=rate).tobytes())
         return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        pass
-    
-    print("❌ Could not create beep file. Install 'sox' or 'ffmpeg':")
-    print("   sudo apt install sox")
-    print("   or: sudo apt install ffmpeg")
-    return False
-
-
-def play_beep(filepath: Path):
-    """Play the beep sound asynchronously."""
-    try:
-        return subprocess.Popen(
-            ['aplay', '-q', str(filepath)],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-    except FileNotFoundError:
-        print("❌ 'aplay' not found")
-        return None
+    except OSError as e:
+        print(f"❌ Could not create beep file: {e}")
+        return False
 
 
 def move_servo(servo, channel: int):
@@ -94,24 +79,33 @@ def move_servo(servo, channel: int):
     servo.set_position(channel, center)
 
 
-def run_test(servo, channel: int, offset_ms: int, beep_path: Path):
-    """Run a single sync test with the given offset."""
+def run_test(servo, channel: int, offset_ms: int, audio: AudioPlayer):
+    """Run a single sync test with the given offset.
+    
+    Audio goes through AudioPlayer.play() with the same timing the
+    animator uses, so the offset found here carries over to the app,
+    player process start-up included.
+    """
     print(f"\n🎵 Testing with offset: {offset_ms}ms")
     print("   Watch the servo and listen for the beep...")
     
     time.sleep(0.5)  # Brief pause before test
     
-    if offset_ms >= 0:
+    offset = offset_ms / 1000.0
+    
+    if offset >= 0:
         # Positive offset: start audio, wait, then move servo
-        play_beep(beep_path)
-        if offset_ms > 0:
-            time.sleep(offset_ms / 1000.0)
+        audio.play(wait_for_start=True)
+        if offset > 0:
+            time.sleep(offset)
         move_servo(servo, channel)
     else:
-        # Negative offset: move servo, wait, then play audio
+        # Negative offset: move servo, audio starts |offset| later
+        # (on a timer, since the move itself takes 150ms)
+        timer = threading.Timer(abs(offset), audio.play)
+        timer.start()
         move_servo(servo, channel)
-        time.sleep(abs(offset_ms) / 1000.0)
-        play_beep(beep_path)
+        timer.join()
     
     time.sleep(0.5)  # Let audio finish
 
@@ -130,6 +124,10 @@ def main():
     if not create_test_beep(beep_path):
         return 1
     
+    # Play the beep the same way the app plays animation audio
+    audio = AudioPlayer(audio_dir=beep_path.parent)
+    audio.set_current_audio(beep_path)
+    
     # Initialize servo
     servo = None
     if HAS_HARDWARE:
@@ -174,7 +172,7 @@ Commands:
             if cmd.lower() == 'q':
                 break
             elif cmd == '':
-                run_test(servo, args.channel, offset, beep_path)
+                run_test(servo, args.channel, offset, audio)
             elif cmd.startswith('+') or cmd.startswith('-') or cmd.lstrip('-').isdigit():
                 try:
                     if cmd.startswith('+'):
@@ -211,6 +209,7 @@ To apply this offset:
 """)
     
     # Cleanup
+    audio.stop()
     if beep_path.exists():
         beep_path.unlink()
     
@@ -1,16 +1,71 @@
 """Animation controller for servo sequences."""
 
+import os
 import time
 import threading
-from typing import List, Dict, Any, Callable, Optional, TYPE_CHECKING
+from typing import List, Dict, Any, Callable, Optional, Tuple, TYPE_CHECKING
 
-from ..config import MIN_PULSE, MAX_PULSE, CENTER_PULSE, STEP, DELAY
-from ..hardware.servo import ServoController
+import numpy as np
+
+from ..config import (
+    MIN_PULSE,
+    MAX_PULSE,
+    CENTER_PULSE,
+    STEP,
+    DELAY,
+    ANIMATION_PRIORITY,
+)
+from ..hardware.servo import NUM_CHANNELS, ServoController
 
 if TYPE_CHECKING:
     from ..audio.player import AudioPlayer
 
 
+def _interpolate(
+    starts: np.ndarray,
+    targets: np.ndarray,
+    steps: int,
+    min_p: int,
+    max_p: int,
+) -> np.ndarray:
+    """Compute a clamped linear trajectory between two position vectors.
+    
+    Args:
+        starts: Starting pulse widths, one per channel
+        targets: Target pulse widths, one per channel
+        steps: Number of interpolation steps
+        min_p: Lower pulse clamp
+        max_p: Upper pulse clamp
+        
+    Returns:
+        int32 array of shape (steps + 1, channels), one row per step
+    """
+    t = np.linspace(0, 1, steps + 1, dtype=np.float32)
+    traj = np.rint(starts + (targets - starts) * t[:, None]).astype(np.int32)
+    np.clip(traj, min_p, max_p, out=traj)
+    return traj
+
+
+def _raise_thread_priority() -> None:
+    """Switch the calling thread to SCHED_FIFO to reduce step jitter.
+
+    Silently keeps the default scheduler when not permitted (non-root)
+    or not supported by the platform.
+    """
+    if not hasattr(os, "sched_setscheduler"):
+        return
+    try:
+        # RESET_ON_FORK keeps children (e.g. the audio player process) from
+        # inheriting the real-time policy
+        os.sched_setscheduler(
+            0,
+            os.SCHED_FIFO | os.SCHED_RESET_ON_FORK,
+            os.sched_param(ANIMATION_PRIORITY),
+        )
+    except OSError:
+        pass
+
+
 class Animator:
     """Handles servo animation sequences."""
 
@@ -27,8 +82,8 @@ class Animator:
         """
         self.servo = servo_controller
         self.audio_player = audio_player
-        self._lock = threading.Lock()
-        self._is_animating = False
+        self._start_lock = threading.Lock()  # Guards only the check-and-set
+        self._animating = threading.Event()
         self._stop_requested = False
 
     def set_audio_player(self, audio_player: "AudioPlayer") -> None:
@@ -42,7 +97,20 @@ class Animator:
     @property
     def is_animating(self) -> bool:
         """Check if an animation is currently running."""
-        return self._is_animating
+        return self._animating.is_set()
+
+    def _try_start(self) -> bool:
+        """Atomically claim the animator for a new animation.
+        
+        Returns:
+            True if claimed, False if an animation is already running
+        """
+        with self._start_lock:
+            if self._animating.is_set():
+                return False
+            self._animating.set()
+            self._stop_requested = False
+        return True
 
     def stop(self) -> None:
         """Request the current animation to stop."""
@@ -68,16 +136,29 @@ class Animator:
             step: Pulse increment per step
             delay: Delay between steps in seconds
         """
-        if start < end:
-            positions = range(start, end + 1, step)
-        else:
-            positions = range(start, end - 1, -step)
+        sign = 1 if start < end else -1
+        positions = np.arange(start, end + sign, sign * step, dtype=np.int32).tolist()
+        # Always finish exactly on the end position
+        if positions[-1] != end:
+            positions.append(end)
+
+        # Bind hot-loop lookups to locals
+        set_position = self.servo.set_position
+        perf_counter = time.perf_counter
+        sleep = time.sleep
+
+        # Pace against absolute deadlines so set_position latency
+        # doesn't accumulate into drift
+        next_t = perf_counter()
 
         for pos in positions:
             if self._stop_requested:
                 return
-            self.servo.set_position(channel, pos)
-            time.sleep(delay)
+            set_position(channel, pos)
+            next_t += delay
+            slack = next_t - perf_counter()
+            if slack > 0:
+                sleep(slack)
 
     def play_preset(self) -> bool:
         """Play the preset animation sequence.
@@ -85,30 +166,29 @@ class Animator:
         Returns:
             True if animation completed, False if already animating
         """
-        with self._lock:
-            if self._is_animating:
-                return False
-            self._is_animating = True
-            self._stop_requested = False
+        if not self._try_start():
+            return False
 
         try:
-            print("Starting servo animation sequence...")
+            self._run_preset()
+            return True
+        finally:
+            self._animating.clear()
 
-            # Servo 0: sweep from center to max, then back
-            self.sweep_servo(0, CENTER_PULSE, MAX_PULSE)
-            self.sweep_servo(0, MAX_PULSE, CENTER_PULSE)
+    def _run_preset(self) -> None:
+        """Run the preset sequence (caller must hold the animating claim)."""
+        print("Starting servo animation sequence...")
 
-            if not self._stop_requested:
-                time.sleep(0.5)
+        # Servo 0: sweep from center to max, then back
+        self.sweep_servo(0, CENTER_PULSE, MAX_PULSE)
+        self.sweep_servo(0, MAX_PULSE, CENTER_PULSE)
 
-            # Servo 1: sweep from center to min, then back
-            self.sweep_servo(1, CENTER_PULSE, MIN_PULSE)
-            self.sweep_servo(1, MIN_PULSE, CENTER_PULSE)
+        if not self._stop_requested:
+            time.sleep(0.5)
 
-            return True
-        finally:
-            with self._lock:
-                self._is_animating = False
+        # Servo 1: sweep from center to min, then back
+        self.sweep_servo(1, CENTER_PULSE, MIN_PULSE)
+        self.sweep_servo(1, MIN_PULSE, CENTER_PULSE)
 
     def play_keyframes(
         self,
@@ -124,73 +204,124 @@ class Animator:
         Returns:
             True if animation completed, False if already animating
         """
-        with self._lock:
-            if self._is_animating:
-                return False
-            self._is_animating = True
-            self._stop_requested = False
+        if not self._try_start():
+            return False
 
         try:
-            # Start audio playback if available and requested
-            has_audio = with_audio and self.audio_player and self.audio_player.current_audio_file
-            audio_delay_thread = None
-            
-            if has_audio:
-                latency = self.audio_player.get_latency_offset_sec()
-                
-                if latency >= 0:
-                    # Positive offset: start audio first, wait, then start servos
-                    self.audio_player.play(wait_for_start=True)
-                    if latency > 0:
-                        time.sleep(latency)
-                else:
-                    # Negative offset: start servos first, audio starts later
-                    # Schedule audio to start after |latency| seconds
-                    def delayed_audio():
-                        time.sleep(abs(latency))
-                        if not self._stop_requested:
-                            self.audio_player.play(wait_for_start=False)
-                    
-                    audio_delay_thread = threading.Thread(target=delayed_audio, daemon=True)
-                    audio_delay_thread.start()
+            self._run_keyframes(keyframes, with_audio)
+            return True
+        finally:
+            self._animating.clear()
+
+    @staticmethod
+    def _prepare_keyframes(
+        keyframes: List[Dict[str, Any]],
+    ) -> List[Tuple[List[int], np.ndarray, np.ndarray, float]]:
+        """Convert keyframe dicts into per-frame channel/target arrays.
+        
+        Returns:
+            List of (channels, channel index array, int32 targets, duration in seconds)
+        """
+        prepared = []
+        for frame in keyframes:
+            # Convert string keys to int (JSON sends keys as strings)
+            # and drop channels the board doesn't have
+            targets = {
+                int(ch): val for ch, val in frame.get("servos", {}).items()
+                if 0 <= int(ch) < NUM_CHANNELS
+            }
+            channels = list(targets)
+            prepared.append((
+                channels,
+                np.array(channels, dtype=np.intp),
+                np.fromiter(targets.values(), dtype=np.int32, count=len(targets)),
+                frame.get("duration", 500) / 1000.0,  # Convert ms to seconds
+            ))
+        return prepared
+
+    def _run_keyframes(self, keyframes: List[Dict[str, Any]], with_audio: bool) -> None:
+        """Run a keyframe sequence (caller must hold the animating claim)."""
+        # Parse everything before audio starts so it can't delay the servos
+        frames = self._prepare_keyframes(keyframes)
+
+        # Start audio playback if available and requested
+        has_audio = with_audio and self.audio_player and self.audio_player.current_audio_file
+        audio_delay = None  # Seconds after servo start to start audio
+        
+        if has_audio:
+            latency = self.audio_player.get_latency_offset_sec()
             
-            for frame in keyframes:
-                if self._stop_requested:
-                    break
+            if latency >= 0:
+                # Positive offset: start audio first, wait, then start servos
+                self.audio_player.play(wait_for_start=True)
+                if latency > 0:
+                    time.sleep(latency)
+            else:
+                # Negative offset: start servos first, audio starts
+                # |latency| seconds later on the playback clock below
+                audio_delay = abs(latency)
+        
+        # Shadow of the commanded positions for this run, indexed by channel,
+        # seeded from the controller for every channel the keyframes drive
+        shadow = np.full(NUM_CHANNELS, CENTER_PULSE, dtype=np.int32)
+        for ch in {ch for channels, _, _, _ in frames for ch in channels}:
+            shadow[ch] = self.servo.get_position(ch)
+
+        # Bind hot-loop lookups to locals
+        set_positions = self.servo.set_positions
+        perf_counter = time.perf_counter
+        sleep = time.sleep
+        delay = DELAY
+
+        # Single monotonic playback clock for the whole sequence
+        next_t = perf_counter()
+        audio_start_at = next_t + audio_delay if audio_delay is not None else None
+
+        for channels, channel_idx, target_arr, duration in frames:
+            if self._stop_requested:
+                break
 
-                duration = frame.get("duration", 500) / 1000.0  # Convert ms to seconds
-                raw_targets = frame.get("servos", {})
-                
-                # Convert string keys to int (JSON sends keys as strings)
-                targets = {int(ch): val for ch, val in raw_targets.items()}
+            # Calculate steps needed
+            steps = max(1, int(duration / delay))
 
-                # Calculate steps needed
-                steps = max(1, int(duration / DELAY))
+            # Get starting positions
+            start_arr = shadow[channel_idx]
 
-                # Get starting positions
-                starts = {
-                    ch: self.servo.get_position(ch) 
-                    for ch in targets
-                }
+            # Precompute the whole trajectory (one row per step)
+            traj = _interpolate(start_arr, target_arr, steps, MIN_PULSE, MAX_PULSE)
 
-                for step_num in range(steps + 1):
-                    if self._stop_requested:
-                        break
+            applied = None
+            for row in traj.tolist():
+                if self._stop_requested:
+                    break
 
-                    t = step_num / steps  # Progress 0 to 1
+                applied = set_positions(dict(zip(channels, row)))
 
-                    for channel, target in targets.items():
-                        start = starts.get(channel, CENTER_PULSE)
-                        pos = int(start + (target - start) * t)
-                        pos = max(MIN_PULSE, min(MAX_PULSE, pos))
-                        self.servo.set_position(channel, pos)
+                next_t += delay
 
-                    time.sleep(DELAY)
+                # Start delayed audio inline when its deadline falls in this step
+                if audio_start_at is not None and audio_start_at <= next_t:
+                    slack = audio_start_at - perf_counter()
+                    if slack > 0:
+                        sleep(slack)
+                    if not self._stop_requested:
+                        self.audio_player.play(wait_for_start=False)
+                    audio_start_at = None
 
-            return True
-        finally:
-            with self._lock:
-                self._is_animating = False
+                slack = next_t - perf_counter()
+                if slack > 0:
+                    sleep(slack)
+
+            if applied:
+                shadow[channel_idx] = list(applied.values())
+
+        # Audio delayed past the end of the motion still starts on schedule
+        if audio_start_at is not None and not self._stop_requested:
+            slack = audio_start_at - perf_counter()
+            if slack > 0:
+                sleep(slack)
+            if not self._stop_requested:
+                self.audio_player.play(wait_for_start=False)
 
     def play_preset_async(self, callback: Optional[Callable[[], None]] = None) -> bool:
         """Play preset animation in a background thread.
@@ -201,11 +332,15 @@ class Animator:
         Returns:
             True if animation started, False if already animating
         """
-        if self._is_animating:
+        if not self._try_start():
             return False
 
         def run():
-            self.play_preset()
+            _raise_thread_priority()
+            try:
+                self._run_preset()
+            finally:
+                self._animating.clear()
             if callback:
                 callback()
 
@@ -229,11 +364,15 @@ class Animator:
         Returns:
             True if animation started, False if already animating
         """
-        if self._is_animating:
+        if not self._try_start():
             return False
 
         def run():
-            self.play_keyframes(keyframes, with_audio=with_audio)
+            _raise_thread_priority()
+            try:
+                self._run_keyframes(keyframes, with_audio)
+            finally:
+                self._animating.clear()
             if callback:
                 callback()
 
@@ -1,14 +1,26 @@
 """Animation storage for saving and loading animations."""
 
-import json
+import os
 import re
+import threading
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, asdict, field, fields
 
+import orjson
 
-@dataclass
+
+# Patterns used to turn animation names into filenames
+_UNSAFE_CHARS_RE = re.compile(r'[^\w\s-]')
+_SEPARATORS_RE = re.compile(r'[-\s]+')
+
+# Metadata index filename (the leading dot can't come out of _sanitize_filename)
+INDEX_FILENAME = ".index.json"
+
+
+@dataclass(slots=True)
 class SavedAnimation:
     """A saved animation with metadata."""
     
@@ -32,7 +44,7 @@ class SavedAnimation:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "SavedAnimation":
-        # Convert string keys back to int for curves
+        # JSON object keys are strings; curves are keyed by int servo id
         curves = {}
         for k, v in data.get("curves", {}).items():
             curves[int(k)] = v
@@ -59,18 +71,131 @@ class AnimationStore:
         """
         self.storage_dir = storage_dir or Path(__file__).parent.parent.parent / "animations"
         self.storage_dir.mkdir(exist_ok=True)
+        self._index_path = self.storage_dir / INDEX_FILENAME
+        # list_all metadata by file stem: [size, mtime_ns, metadata]
+        self._index: Optional[Dict[str, List[Any]]] = None
+        self._index_lock = threading.Lock()
     
-    def _sanitize_filename(self, name: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _sanitize_filename(name: str) -> str:
         """Convert animation name to safe filename."""
         # Remove/replace unsafe characters
-        safe = re.sub(r'[^\w\s-]', '', name.lower())
-        safe = re.sub(r'[-\s]+', '-', safe).strip('-')
+        safe = _UNSAFE_CHARS_RE.sub('', name.lower())
+        safe = _SEPARATORS_RE.sub('-', safe).strip('-')
         return safe or "untitled"
     
     def _get_filepath(self, name: str) -> Path:
         """Get the file path for an animation."""
         return self.storage_dir / f"{self._sanitize_filename(name)}.json"
     
+    def _animation_files(self) -> List[Path]:
+        """List animation files in the storage directory (excluding the index)."""
+        # scandir answers is_file() from the directory entry type, so the
+        # listing costs no per-file stat calls
+        with os.scandir(self.storage_dir) as entries:
+            return [
+                Path(entry.path) for entry in entries
+                if entry.name.endswith(".json")
+                and entry.name != INDEX_FILENAME
+                and entry.is_file()
+            ]
+    
+    def _animation_stats(self) -> Dict[str, Tuple[Path, List[int]]]:
+        """Map each animation file's stem to its path and [size, mtime_ns]."""
+        stats = {}
+        with os.scandir(self.storage_dir) as entries:
+            for entry in entries:
+                if (
+                    entry.name.endswith(".json")
+                    and entry.name != INDEX_FILENAME
+                    and entry.is_file()
+                ):
+                    st = entry.stat()
+                    path = Path(entry.path)
+                    stats[path.stem] = (path, [st.st_size, st.st_mtime_ns])
+        return stats
+    
+    @staticmethod
+    def _metadata(filename: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the list_all metadata entry for an animation."""
+        return {
+            "filename": filename,
+            "name": data.get("name", filename),
+            "duration_ms": data.get("duration_ms", 0),
+            "audio_file": data.get("audio_file"),
+            "created_at": data.get("created_at", ""),
+            "updated_at": data.get("updated_at", ""),
+            "num_curves": len(data.get("curves", {})),
+        }
+    
+    @staticmethod
+    def _read_json(filepath: Path) -> Optional[Any]:
+        """Read and parse a JSON file, or return None if missing or invalid."""
+        # A single read() into bytes, parsed without a str decode; files
+        # are a few KB, so mmap setup would cost more than it saves
+        try:
+            return orjson.loads(filepath.read_bytes())
+        except (orjson.JSONDecodeError, IOError):
+            return None
+    
+    def _read_metadata(self, filepath: Path) -> Optional[Dict[str, Any]]:
+        """Parse an animation file and return its metadata entry."""
+        data = self._read_json(filepath)
+        if data is None:
+            return None
+        return self._metadata(filepath.stem, data)
+    
+    def _load_index(self) -> Dict[str, List[Any]]:
+        """Return the metadata index as last written, loading it on first use.
+        
+        Must be called with _index_lock held.
+        """
+        if self._index is None:
+            self._index = self._read_json(self._index_path) or {}
+        return self._index
+    
+    def _get_index(self) -> Dict[str, List[Any]]:
+        """Return the metadata index, reconciled with the directory.
+        
+        Must be called with _index_lock held.
+        """
+        index = self._load_index()
+        
+        # Reconcile with the directory: entries are keyed by size and
+        # mtime, so files copied in, removed or edited by hand are picked
+        # up without parsing the unchanged ones
+        on_disk = self._animation_stats()
+        changed = False
+        for stem in list(index):
+            if stem not in on_disk:
+                del index[stem]
+                changed = True
+        for stem, (filepath, key) in on_disk.items():
+            entry = index.get(stem)
+            # Entries from an older index format are dicts; rebuild those
+            if isinstance(entry, list) and entry[:2] == key:
+                continue
+            metadata = self._read_metadata(filepath)
+            if metadata is not None:
+                index[stem] = key + [metadata]
+                changed = True
+            elif index.pop(stem, None) is not None:
+                changed = True
+        if changed:
+            self._write_index()
+        
+        return index
+    
+    def _write_index(self) -> None:
+        """Atomically write the metadata index to disk."""
+        tmp = self._index_path.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(orjson.dumps(self._index))
+            os.replace(tmp, self._index_path)
+        except IOError:
+            pass  # The index is a cache; it will be rebuilt next time
+    
     def save(self, animation: SavedAnimation) -> Path:
         """Save an animation to disk.
         
@@ -84,12 +209,27 @@ class AnimationStore:
         
         filepath = self._get_filepath(animation.name)
         
-        # Convert curves keys to strings for JSON
-        data = animation.to_dict()
-        data["curves"] = {str(k): v for k, v in animation.curves.items()}
+        # Shallow field view: unlike asdict() this doesn't deep-copy the
+        # curves, and orjson writes the int curve keys as strings for us
+        data = {f.name: getattr(animation, f.name) for f in fields(animation)}
+        
+        encoded = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
         
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2)
+        # Concurrent saves of the same animation share the temp name, so
+        # the write, rename and index update run under the index lock
+        with self._index_lock:
+            # Write to a temp file and rename over the target so a crash
+            # mid-write never leaves a truncated animation behind
+            tmp = filepath.with_suffix(".json.tmp")
+            tmp.write_bytes(encoded)
+            os.replace(tmp, filepath)
+            st = filepath.stat()
+            
+            index = self._load_index()
+            index[filepath.stem] = [
+                st.st_size, st.st_mtime_ns, self._metadata(filepath.stem, data),
+            ]
+            self._write_index()
         
         return filepath
     
@@ -106,19 +246,15 @@ class AnimationStore:
         
         if not filepath.exists():
             # Try exact filename match
-            for f in self.storage_dir.glob("*.json"):
+            for f in self._animation_files():
                 if f.stem.lower() == name.lower():
                     filepath = f
                     break
             else:
                 return None
         
-        try:
-            with open(filepath) as f:
-                data = json.load(f)
-            return SavedAnimation.from_dict(data)
-        except (json.JSONDecodeError, IOError):
-            return None
+        data = self._read_json(filepath)
+        return SavedAnimation.from_dict(data) if data is not None else None
     
     def load_by_filename(self, filename: str) -> Optional[SavedAnimation]:
         """Load an animation by its filename.
@@ -132,17 +268,12 @@ class AnimationStore:
         if not filename.endswith('.json'):
             filename = f"{filename}.json"
         
-        filepath = self.storage_dir / filename
-        
-        if not filepath.exists():
+        if filename == INDEX_FILENAME:
             return None
         
-        try:
-            with open(filepath) as f:
-                data = json.load(f)
-            return SavedAnimation.from_dict(data)
-        except (json.JSONDecodeError, IOError):
-            return None
+        # Missing files are handled by _read_json, no separate exists() stat
+        data = self._read_json(self.storage_dir / filename)
+        return SavedAnimation.from_dict(data) if data is not None else None
     
     def delete(self, name: str) -> bool:
         """Delete an animation.
@@ -157,7 +288,7 @@ class AnimationStore:
         
         if not filepath.exists():
             # Try exact filename match
-            for f in self.storage_dir.glob("*.json"):
+            for f in self._animation_files():
                 if f.stem.lower() == name.lower():
                     filepath = f
                     break
@@ -165,6 +296,12 @@ class AnimationStore:
                 return False
         
         filepath.unlink()
+        
+        with self._index_lock:
+            index = self._load_index()
+            if index.pop(filepath.stem, None) is not None:
+                self._write_index()
+        
         return True
     
     def list_all(self) -> List[Dict[str, Any]]:
@@ -173,24 +310,8 @@ class AnimationStore:
         Returns:
             List of animation metadata dicts
         """
-        animations = []
-        
-        for filepath in sorted(self.storage_dir.glob("*.json")):
-            try:
-                with open(filepath) as f:
-                    data = json.load(f)
-                
-                animations.append({
-                    "filename": filepath.stem,
-                    "name": data.get("name", filepath.stem),
-                    "duration_ms": data.get("duration_ms", 0),
-                    "audio_file": data.get("audio_file"),
-                    "created_at": data.get("created_at", ""),
-                    "updated_at": data.get("updated_at", ""),
-                    "num_curves": len(data.get("curves", {})),
-                })
-            except (json.JSONDecodeError, IOError):
-                continue
+        with self._index_lock:
+            animations = [dict(entry[2]) for entry in self._get_index().values()]
         
         # Sort by updated_at, newest first
         animations.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
@@ -1,12 +1,17 @@
 """Audio player for Waveshare WM8960 Audio HAT."""
 
 import os
+import shutil
 import subprocess
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import AbstractSet, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
 import wave
-import struct
+
+import numpy as np
+import orjson
 
 try:
     from pydub import AudioSegment
@@ -21,6 +26,27 @@ except ImportError:
     HAS_MUTAGEN = False
 
 
+# Supported audio file extensions (a tuple, for str.endswith)
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".ogg", ".flac")
+
+# Sidecar cache of probed durations, stored in the audio directory
+DURATION_CACHE_FILENAME = ".durations.json"
+
+# Per-file waveform sidecar, appended to the audio filename
+WAVEFORM_SUFFIX = ".waveform.json"
+
+
+@lru_cache(maxsize=8)
+def _placeholder_waveform(num_samples: int) -> Tuple[float, ...]:
+    """Compute the placeholder pattern once per size (it's input-independent)."""
+    t = np.arange(num_samples) / num_samples
+    # Multiple sine waves for a more natural look
+    val = 0.3 + 0.2 * np.sin(t * np.pi * 8)
+    val += 0.1 * np.sin(t * np.pi * 23)
+    val += 0.05 * np.sin(t * np.pi * 47)
+    return tuple(np.clip(val, 0.1, 0.7).tolist())
+
+
 class AudioPlayer:
     """Audio player that uses ALSA for playback on WM8960 HAT."""
 
@@ -37,13 +63,18 @@ class AudioPlayer:
         
         # Fallback values if no config store
         self._local_offset_ms = 150
-        self._local_current_file: Optional[Path] = None
+        self._current_path: Optional[Path] = None  # Updated only on selection
         
         self._current_process: Optional[subprocess.Popen] = None
         self._lock = threading.Lock()
         self._is_playing = False
         self._play_started_event = threading.Event()
         
+        # Probed durations by filename: [size, mtime_ns, duration_ms]
+        self._duration_cache: Optional[Dict[str, List[int]]] = None
+        self._duration_cache_dirty = False
+        self._cache_lock = threading.Lock()
+        
         # Restore current audio from config on startup
         self._restore_current_audio()
 
@@ -55,62 +86,164 @@ class AudioPlayer:
     @property
     def current_audio_file(self) -> Optional[Path]:
         """Get the path to the current audio file."""
-        if self._config_store and self._config_store.current_audio_file:
-            path = self.audio_dir / self._config_store.current_audio_file
-            if path.exists():
-                return path
-            # File doesn't exist anymore, clear the config
-            self._config_store.current_audio_file = ""
-        return self._local_current_file
+        return self._current_path
     
     def _restore_current_audio(self) -> None:
         """Restore current audio file from config on startup."""
         if self._config_store and self._config_store.current_audio_file:
             path = self.audio_dir / self._config_store.current_audio_file
             if path.exists():
+                self._current_path = path
                 print(f"Restored audio: {self._config_store.current_audio_file}")
+            else:
+                # File doesn't exist anymore, clear the config
+                self._config_store.current_audio_file = ""
 
     def get_audio_duration_ms(self, filepath: Path) -> int:
         """Get the duration of an audio file in milliseconds.
         
+        Results are cached on disk keyed by file size and mtime, and held
+        in memory once loaded, so each file is only probed once and repeat
+        lookups (e.g. /audio/current polls) cost a stat and a dict lookup.
+        
         Args:
             filepath: Path to the audio file
             
         Returns:
             Duration in milliseconds
         """
+        # Fast path for a cache hit: no batch bookkeeping, nothing to flush
+        try:
+            st = filepath.stat()
+        except OSError:
+            return 0
+        with self._cache_lock:
+            entry = self._get_duration_cache().get(filepath.name)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        
+        duration = self._get_durations_batch([(filepath, st)])[filepath]
+        self._flush_duration_cache()
+        return duration
+
+    def _get_duration_cache(self) -> Dict[str, List[int]]:
+        """Return the duration cache, loading it on first use.
+        
+        Must be called with _cache_lock held.
+        """
+        if self._duration_cache is None:
+            try:
+                path = self.audio_dir / DURATION_CACHE_FILENAME
+                self._duration_cache = orjson.loads(path.read_bytes())
+            except (orjson.JSONDecodeError, IOError):
+                self._duration_cache = {}
+        return self._duration_cache
+
+    def _get_durations_batch(
+        self,
+        files: List[Tuple[Path, Optional[os.stat_result]]],
+    ) -> Dict[Path, int]:
+        """Get durations for several files, probing cache misses in parallel.
+        
+        Each probe may spawn ffprobe, so misses are run concurrently to
+        overlap the process start-up cost.
+        
+        Args:
+            files: (path, stat) pairs; stat may be None to stat here
+        """
+        durations: Dict[Path, int] = {}
+        misses = []
+        
+        with self._cache_lock:
+            cache = self._get_duration_cache()
+            for path, st in files:
+                try:
+                    st = st or path.stat()
+                except OSError:
+                    durations[path] = 0
+                    continue
+                key = [st.st_size, st.st_mtime_ns]
+                entry = cache.get(path.name)
+                if entry and entry[:2] == key:
+                    durations[path] = entry[2]
+                else:
+                    misses.append((path, key))
+        
+        if not misses:
+            return durations
+        
+        if len(misses) == 1:
+            probed = [self._probe_duration_ms(misses[0][0])]
+        else:
+            workers = min(len(misses), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                probed = list(executor.map(self._probe_duration_ms, [p for p, _ in misses]))
+        
+        with self._cache_lock:
+            cache = self._get_duration_cache()
+            for (path, key), duration in zip(misses, probed):
+                cache[path.name] = key + [duration]
+                durations[path] = duration
+            self._duration_cache_dirty = True
+        
+        return durations
+
+    def _flush_duration_cache(self, present: Optional[AbstractSet[str]] = None) -> None:
+        """Write the duration cache to disk if it has changed.
+        
+        Args:
+            present: Names of the audio files currently in audio_dir, if
+                known; entries for any other files are dropped first
+        """
+        with self._cache_lock:
+            if present is not None:
+                cache = self._get_duration_cache()
+                stale = cache.keys() - present
+                for name in stale:
+                    del cache[name]
+                if stale:
+                    self._duration_cache_dirty = True
+            if not self._duration_cache_dirty:
+                return
+            path = self.audio_dir / DURATION_CACHE_FILENAME
+            tmp = path.with_suffix(".tmp")
+            try:
+                tmp.write_bytes(orjson.dumps(self._duration_cache))
+                os.replace(tmp, path)
+                self._duration_cache_dirty = False
+            except IOError:
+                pass  # Keep it dirty and retry on the next flush
+
+    def _probe_duration_ms(self, filepath: Path) -> int:
+        """Determine the duration of an audio file by reading it."""
         suffix = filepath.suffix.lower()
         
         if suffix == '.wav':
             return self._get_wav_duration_ms(filepath)
         elif suffix == '.mp3':
-            # Try multiple methods for MP3
+            # Header-based methods only; pydub would decode the whole file
             if HAS_MUTAGEN:
                 duration = self._get_mp3_duration_mutagen(filepath)
                 if duration > 0:
                     return duration
-            if HAS_PYDUB:
-                try:
-                    audio = AudioSegment.from_mp3(filepath)
-                    return len(audio)
-                except Exception:
-                    pass
             # Try ffprobe
             duration = self._get_duration_ffprobe(filepath)
             if duration > 0:
                 return duration
             # Last resort: estimate from file size
             return self._estimate_mp3_duration(filepath)
-        elif HAS_PYDUB:
-            # Try pydub for other formats
-            try:
-                audio = AudioSegment.from_file(filepath)
-                return len(audio)
-            except Exception:
-                pass
         
-        # Fallback: use ffprobe if available
-        return self._get_duration_ffprobe(filepath)
+        # Other formats: ffprobe reads the container header
+        duration = self._get_duration_ffprobe(filepath)
+        if duration > 0 or not HAS_PYDUB:
+            return duration
+        
+        # Fallback: decode with pydub
+        try:
+            audio = AudioSegment.from_file(filepath)
+            return len(audio)
+        except Exception:
+            return 0
 
     def _get_wav_duration_ms(self, filepath: Path) -> int:
         """Get WAV file duration using wave module."""
@@ -160,11 +293,11 @@ class AudioPlayer:
         except Exception:
             return 0
 
-    def save_audio(self, file_data: bytes, filename: str) -> Path:
+    def save_audio(self, file_data: Union[bytes, BinaryIO], filename: str) -> Path:
         """Save uploaded audio file.
         
         Args:
-            file_data: Raw audio file bytes
+            file_data: Raw audio file bytes, or a binary stream to copy from
             filename: Original filename
             
         Returns:
@@ -174,15 +307,29 @@ class AudioPlayer:
         safe_name = "".join(c for c in filename if c.isalnum() or c in "._-")
         filepath = self.audio_dir / safe_name
         
-        # Handle duplicates
+        # Handle duplicates; "x" mode claims the name atomically, so
+        # concurrent uploads can't pick the same one
         counter = 1
         base = filepath.stem
         suffix = filepath.suffix
-        while filepath.exists():
-            filepath = self.audio_dir / f"{base}_{counter}{suffix}"
-            counter += 1
+        while True:
+            try:
+                out = open(filepath, "xb")
+                break
+            except FileExistsError:
+                filepath = self.audio_dir / f"{base}_{counter}{suffix}"
+                counter += 1
         
-        filepath.write_bytes(file_data)
+        try:
+            with out:
+                if isinstance(file_data, bytes):
+                    out.write(file_data)
+                else:
+                    # Stream in 1 MB chunks rather than holding the whole file
+                    shutil.copyfileobj(file_data, out, length=1 << 20)
+        except BaseException:
+            filepath.unlink(missing_ok=True)  # Don't leave a partial file
+            raise
         return filepath
 
     def set_current_audio(self, filepath: Optional[Path]) -> None:
@@ -191,15 +338,12 @@ class AudioPlayer:
         Args:
             filepath: Path to audio file, or None to clear
         """
-        self._local_current_file = filepath
+        self._current_path = filepath
         
         # Persist to config
         if self._config_store:
             self._config_store.current_audio_file = filepath.name if filepath else ""
-            try:
-                self._config_store.save_config()
-            except Exception:
-                pass
+            self._config_store.mark_dirty()
 
     def get_waveform_data(self, filepath: Path, num_samples: int = 200) -> list:
         """Get normalized waveform data for visualization.
@@ -211,96 +355,128 @@ class AudioPlayer:
         Returns:
             List of normalized amplitude values (0 to 1)
         """
+        # Decoded waveforms are cached in a sidecar next to the audio file,
+        # keyed like the duration cache so edits to the file invalidate it
+        sidecar = filepath.with_name(filepath.name + WAVEFORM_SUFFIX)
+        try:
+            st = filepath.stat()
+        except OSError:
+            return self._generate_placeholder_waveform(num_samples)
+        key = [st.st_size, st.st_mtime_ns, num_samples]
+        
+        # A null waveform records a file that couldn't be analyzed, so it
+        # isn't decoded again until it changes
+        try:
+            cached = orjson.loads(sidecar.read_bytes())
+            if cached.get("key") == key:
+                waveform = cached["waveform"]
+                return waveform if waveform else self._generate_placeholder_waveform(num_samples)
+        except (orjson.JSONDecodeError, IOError, AttributeError, KeyError):
+            pass
+        
+        waveform = self._extract_waveform(filepath, num_samples) or None
+        
+        tmp = sidecar.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(orjson.dumps({"key": key, "waveform": waveform}))
+            os.replace(tmp, sidecar)
+        except IOError:
+            pass  # The sidecar is a cache; recompute next time
+        
+        if waveform is None:
+            # Fallback: generate a simple placeholder waveform
+            # This shows that audio exists even if we can't analyze it
+            return self._generate_placeholder_waveform(num_samples)
+        return waveform
+
+    def _extract_waveform(self, filepath: Path, num_samples: int) -> list:
+        """Decode an audio file into waveform data, or [] if it can't be analyzed."""
         suffix = filepath.suffix.lower()
         
         try:
             if suffix == '.wav':
-                waveform = self._get_wav_waveform(filepath, num_samples)
-                if waveform:
-                    return waveform
+                return self._get_wav_waveform(filepath, num_samples)
             elif HAS_PYDUB:
                 # Use pydub for non-WAV formats
                 try:
                     audio = AudioSegment.from_file(filepath)
+                    # get_array_of_samples() is already a typed array.array;
+                    # pass it through rather than boxing every sample in a list
                     samples = audio.get_array_of_samples()
-                    waveform = self._normalize_samples(list(samples), num_samples, audio.max_possible_amplitude)
-                    if waveform:
-                        return waveform
+                    return self._normalize_samples(samples, num_samples, audio.max_possible_amplitude)
                 except Exception as e:
                     print(f"Pydub waveform extraction failed: {e}")
         except Exception as e:
             print(f"Error getting waveform: {e}")
         
-        # Fallback: generate a simple placeholder waveform
-        # This shows that audio exists even if we can't analyze it
-        return self._generate_placeholder_waveform(num_samples)
+        return []
 
     def _generate_placeholder_waveform(self, num_samples: int) -> list:
         """Generate a simple placeholder waveform pattern.
         
         Creates a subtle visual indication that audio exists.
         """
-        import math
-        waveform = []
-        for i in range(num_samples):
-            # Create a gentle wave pattern with some variation
-            t = i / num_samples
-            # Multiple sine waves for a more natural look
-            val = 0.3 + 0.2 * math.sin(t * math.pi * 8)
-            val += 0.1 * math.sin(t * math.pi * 23)
-            val += 0.05 * math.sin(t * math.pi * 47)
-            waveform.append(max(0.1, min(0.7, val)))
-        return waveform
+        return list(_placeholder_waveform(num_samples))
 
     def _get_wav_waveform(self, filepath: Path, num_samples: int) -> list:
-        """Extract waveform from WAV file."""
+        """Extract waveform from WAV file.
+        
+        Frames are streamed one bucket at a time, so memory use is bounded
+        by the bucket size rather than the length of the file.
+        """
         try:
             with wave.open(str(filepath), 'rb') as wav:
                 n_channels = wav.getnchannels()
                 sample_width = wav.getsampwidth()
                 n_frames = wav.getnframes()
                 
-                # Read all frames
-                raw_data = wav.readframes(n_frames)
-                
-                # Parse samples based on sample width
+                # 8-bit WAV is unsigned and gets re-centred around zero
                 if sample_width == 1:
-                    fmt = f'{n_frames * n_channels}B'
-                    max_val = 255
-                elif sample_width == 2:
-                    fmt = f'{n_frames * n_channels}h'
-                    max_val = 32767
+                    dtype, offset, max_val = np.uint8, 128, 128
+                elif sample_width in (2, 4):
+                    dtype = np.int16 if sample_width == 2 else np.int32
+                    offset, max_val = 0, np.iinfo(dtype).max
                 else:
-                    fmt = f'{n_frames * n_channels}i'
-                    max_val = 2147483647
-                
-                samples = list(struct.unpack(fmt, raw_data))
+                    return []  # e.g. 24-bit; caller falls back to a placeholder
                 
-                # Mix to mono if stereo
-                if n_channels == 2:
-                    samples = [(samples[i] + samples[i + 1]) / 2 for i in range(0, len(samples), 2)]
+                frames_per_bucket = max(1, n_frames // num_samples)
+                n_buckets = min(num_samples, n_frames // frames_per_bucket)
                 
-                return self._normalize_samples(samples, num_samples, max_val)
+                peaks = []
+                for _ in range(n_buckets):
+                    samples = np.frombuffer(wav.readframes(frames_per_bucket), dtype=dtype)
+                    # Drop any partial trailing frame, then mix down to mono
+                    usable = len(samples) - len(samples) % n_channels
+                    if not usable:
+                        break  # Header overstates the data (truncated file)
+                    mono = samples[:usable].reshape(-1, n_channels).mean(axis=1) - offset
+                    peaks.append(float(np.abs(mono).max()) / max_val)
+            
+            return peaks
         except Exception as e:
             print(f"Error reading WAV: {e}")
             return []
 
-    def _normalize_samples(self, samples: list, num_samples: int, max_val: int) -> list:
+    def _normalize_samples(self, samples: Sequence[int], num_samples: int, max_val: int) -> list:
         """Normalize and downsample audio samples for visualization."""
         if not samples:
             return []
         
+        # Takes any buffer (pydub's array.array included) without copying
+        samples = np.asarray(samples)
         chunk_size = max(1, len(samples) // num_samples)
-        result = []
+        starts = np.arange(0, len(samples), chunk_size)[:num_samples]
+        if max_val <= 0:
+            return [0] * len(starts)
         
-        for i in range(0, len(samples), chunk_size):
-            chunk = samples[i:i + chunk_size]
-            if chunk:
-                # Get peak amplitude in chunk
-                peak = max(abs(min(chunk)), abs(max(chunk)))
-                result.append(peak / max_val if max_val > 0 else 0)
+        # Drop the tail past the last chunk so reduceat doesn't fold it in
+        samples = samples[:starts[-1] + chunk_size]
         
-        return result[:num_samples]
+        # Peak amplitude per chunk in one C pass each for the extremes;
+        # widen before negating so the minimum int16 doesn't overflow
+        highs = np.maximum.reduceat(samples, starts).astype(np.int64)
+        lows = np.minimum.reduceat(samples, starts).astype(np.int64)
+        return (np.maximum(highs, -lows) / max_val).tolist()
 
     def play(self, wait_for_start: bool = False) -> bool:
         """Start playing the current audio file.
@@ -311,7 +487,8 @@ class AudioPlayer:
         Returns:
             True if playback started, False otherwise
         """
-        if not self.current_audio_file or not self.current_audio_file.exists():
+        filepath = self._current_path
+        if not filepath or not filepath.exists():
             return False
         
         with self._lock:
@@ -324,17 +501,17 @@ class AudioPlayer:
         def _play_audio():
             try:
                 # Use aplay for WAV, or convert/use mpg123 for MP3
-                suffix = self.current_audio_file.suffix.lower()
+                suffix = filepath.suffix.lower()
                 
                 if suffix == '.wav':
                     # Use lower buffer for less latency
-                    cmd = ['aplay', '--buffer-size=2048', str(self.current_audio_file)]
+                    cmd = ['aplay', '--buffer-size=2048', str(filepath)]
                 elif suffix == '.mp3':
                     # mpg123 with lower buffer for less latency
-                    cmd = ['mpg123', '-q', '--buffer', '1024', str(self.current_audio_file)]
+                    cmd = ['mpg123', '-q', '--buffer', '1024', str(filepath)]
                 else:
                     # Use ffplay as fallback
-                    cmd = ['ffplay', '-nodisp', '-autoexit', '-loglevel', 'quiet', str(self.current_audio_file)]
+                    cmd = ['ffplay', '-nodisp', '-autoexit', '-loglevel', 'quiet', str(filepath)]
                 
                 self._current_process = subprocess.Popen(
                     cmd,
@@ -400,19 +577,55 @@ class AudioPlayer:
         self.stop()
         self.set_current_audio(None)
 
-    def list_audio_files(self) -> list:
+    def list_audio_files(self, with_duration: bool = False) -> list:
         """List all stored audio files.
         
+        Args:
+            with_duration: Also report each file's duration. Off by default
+                since it may need to probe files; see get_audio_info().
+        
         Returns:
-            List of audio file info dicts
+            List of audio file info dicts (duration_ms is None unless requested)
         """
+        # scandir hands back the name without building a Path per entry,
+        # and its stat() result doubles as the duration cache key
         files = []
-        for f in self.audio_dir.iterdir():
-            if f.suffix.lower() in ('.wav', '.mp3', '.ogg', '.flac'):
-                files.append({
-                    'name': f.name,
-                    'path': str(f),
-                    'duration_ms': self.get_audio_duration_ms(f)
-                })
-        return files
+        with os.scandir(self.audio_dir) as entries:
+            for entry in entries:
+                if (
+                    entry.name.lower().endswith(AUDIO_EXTENSIONS)
+                    and entry.is_file()
+                ):
+                    files.append((Path(entry.path), entry.stat() if with_duration else None))
+        
+        durations = self._get_durations_batch(files) if with_duration else {}
+        # A full listing also prunes cache entries for deleted/renamed files
+        self._flush_duration_cache(present={path.name for path, _ in files})
+        
+        return [
+            {
+                'name': path.name,
+                'path': str(path),
+                'duration_ms': durations.get(path),
+            }
+            for path, _ in files
+        ]
 
+    def get_audio_info(self, filename: str) -> Optional[dict]:
+        """Get info about a single stored audio file, probing its duration.
+        
+        Args:
+            filename: Name of a file in the audio directory
+            
+        Returns:
+            Audio file info dict, or None if the file doesn't exist
+        """
+        filepath = self.audio_dir / Path(filename).name  # No path traversal
+        if not filepath.is_file():
+            return None
+        
+        return {
+            'name': filepath.name,
+            'path': str(filepath),
+            'duration_ms': self.get_audio_duration_ms(filepath),
+        }
@@ -14,8 +14,10 @@ CENTER_PULSE = 1500
 # Animation settings
 STEP = 20  # Pulse increment per step
 DELAY = 0.02  # Seconds between steps (20ms)
+ANIMATION_PRIORITY = 20  # SCHED_FIFO priority for animation threads (needs root)
 
 # Web server settings
 HOST = "0.0.0.0"
 PORT = 5000
+SERVER_THREADS = 8  # Request threads when served by waitress
 
@@ -1,8 +1,13 @@
 """PCA9685 16-Channel PWM Servo Driver for Raspberry Pi."""
 
+import os
 import time
 import math
-import smbus2 as smbus
+import fcntl
+from typing import Dict, List
+
+# i2c-dev ioctl: bind the file descriptor to a slave address
+_I2C_SLAVE = 0x0703
 
 
 class PCA9685:
@@ -16,30 +21,62 @@ class PCA9685:
     _LED0_OFF_L = 0x08
     _LED0_OFF_H = 0x09
 
-    def __init__(self, address: int = 0x40, debug: bool = False):
+    # MODE1 bits
+    _AI = 0x20  # Register auto-increment
+
+    # Plain i2c-dev writes aren't bound by SMBus's 32-byte block limit,
+    # so all 16 channels (64 registers) fit in a single transaction
+    _BLOCK_CHANNELS = 16
+
+    def __init__(self, address: int = 0x40, debug: bool = False, bus: int = 1):
         """Initialize the PCA9685.
         
         Args:
             address: I2C address of the PCA9685 (default 0x40)
             debug: Enable debug output
+            bus: I2C bus number (/dev/i2c-N)
         """
-        self.bus = smbus.SMBus(1)
+        # Talk to i2c-dev directly: the slave address is bound once, then
+        # each transaction is a single os.write() of [reg, data...]
+        self._fd = os.open(f"/dev/i2c-{bus}", os.O_RDWR)
+        fcntl.ioctl(self._fd, _I2C_SLAVE, address)
         self.address = address
         self.debug = debug
+        self._period_us = 20000  # PWM period, updated by set_pwm_freq (50Hz default)
         
         if self.debug:
             print("Resetting PCA9685")
-        self._write(self._MODE1, 0x00)
+        # Enable auto-increment so multi-register block writes land in order
+        self._write(self._MODE1, self._AI)
+
+    def close(self) -> None:
+        """Close the I2C device."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __del__(self):
+        # _fd is missing if os.open() failed in __init__
+        if getattr(self, "_fd", None) is not None:
+            self.close()
 
     def _write(self, reg: int, value: int) -> None:
         """Write an 8-bit value to the specified register."""
-        self.bus.write_byte_data(self.address, reg, value)
+        os.write(self._fd, bytes((reg, value)))
         if self.debug:
             print(f"I2C: Write 0x{value:02X} to register 0x{reg:02X}")
 
+    def _write_block(self, reg: int, values: List[int]) -> None:
+        """Write consecutive registers starting at reg in one transaction."""
+        os.write(self._fd, bytes([reg, *values]))
+        if self.debug:
+            print(f"I2C: Write {len(values)} bytes from register 0x{reg:02X}")
+
     def _read(self, reg: int) -> int:
         """Read an unsigned byte from the I2C device."""
-        result = self.bus.read_byte_data(self.address, reg)
+        # Set the register pointer, then read it back
+        os.write(self._fd, bytes((reg,)))
+        result = os.read(self._fd, 1)[0]
         if self.debug:
             print(f"I2C: Device 0x{self.address:02X} returned 0x{result:02X} from reg 0x{reg:02X}")
         return result
@@ -71,6 +108,7 @@ class PCA9685:
         self._write(self._MODE1, oldmode)
         time.sleep(0.005)
         self._write(self._MODE1, oldmode | 0x80)
+        self._period_us = 1_000_000 // freq
 
     def set_pwm(self, channel: int, on: int, off: int) -> None:
         """Set a single PWM channel.
@@ -80,25 +118,62 @@ class PCA9685:
             on: On time (0-4095)
             off: Off time (0-4095)
         """
-        self._write(self._LED0_ON_L + 4 * channel, on & 0xFF)
-        self._write(self._LED0_ON_H + 4 * channel, on >> 8)
-        self._write(self._LED0_OFF_L + 4 * channel, off & 0xFF)
-        self._write(self._LED0_OFF_H + 4 * channel, off >> 8)
+        # ON_L, ON_H, OFF_L, OFF_H in one auto-increment transaction
+        self._write_block(
+            self._LED0_ON_L + 4 * channel,
+            [on & 0xFF, on >> 8, off & 0xFF, off >> 8],
+        )
         
         if self.debug:
             print(f"channel: {channel}  LED_ON: {on} LED_OFF: {off}")
 
+    def set_pwm_multi(self, updates: Dict[int, int]) -> None:
+        """Set the off time of several channels (on time 0) in as few writes as possible.
+        
+        Each run of contiguous channels is sent as a single auto-increment
+        block write.
+        
+        Args:
+            updates: Dictionary mapping channel (0-15) to off time (0-4095)
+        """
+        channels = sorted(updates)
+        i = 0
+        while i < len(channels):
+            first = channels[i]
+            payload: List[int] = []
+            while (
+                i < len(channels)
+                and channels[i] == first + len(payload) // 4
+                and len(payload) < 4 * self._BLOCK_CHANNELS
+            ):
+                off = updates[channels[i]]
+                payload += [0, 0, off & 0xFF, off >> 8]
+                i += 1
+            self._write_block(self._LED0_ON_L + 4 * first, payload)
+
     def set_servo_pulse(self, channel: int, pulse: int) -> None:
         """Set the servo pulse width.
         
-        The PWM frequency must be 50Hz for standard servos.
+        Standard servos expect a 50Hz PWM frequency (20000us period).
         
         Args:
             channel: PWM channel (0-15)
             pulse: Pulse width in microseconds (typically 500-2500)
         """
-        pulse = pulse * 4096 / 20000  # PWM frequency is 50Hz, period is 20000us
-        self.set_pwm(channel, 0, int(pulse))
+        # Integer scaling to 12-bit counts (exact floor, no float ops)
+        self.set_pwm(channel, 0, pulse * 4096 // self._period_us)
+
+    def set_servo_pulses(self, pulses: Dict[int, int]) -> None:
+        """Set the pulse width of several servos using batched block writes.
+        
+        Args:
+            pulses: Dictionary mapping channel (0-15) to pulse width in microseconds
+        """
+        period_us = self._period_us
+        self.set_pwm_multi({
+            channel: pulse * 4096 // period_us
+            for channel, pulse in pulses.items()
+        })
 
     # Backwards compatibility aliases
     def setPWMFreq(self, freq: int) -> None:
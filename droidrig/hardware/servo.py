@@ -1,6 +1,11 @@
 """Servo controller with position tracking."""
 
-from typing import Dict, Optional
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+
 from .pca9685 import PCA9685
 from ..config import (
     PCA9685_ADDRESS,
@@ -11,6 +16,9 @@ from ..config import (
 )
 from ..servo_config import ServoConfigStore, ServoSettings
 
+# Output channels on the PCA9685
+NUM_CHANNELS = 16
+
 
 class ServoController:
     """High-level servo controller with position tracking and per-servo config."""
@@ -26,9 +34,14 @@ class ServoController:
             num_servos: Number of servos to control (ignored if config_store provided)
             config_store: Optional ServoConfigStore for per-servo settings
         """
+        # Serializes bus writes and config changes across request threads
+        # and the animation thread (reentrant: setters call each other)
+        self._lock = threading.RLock()
+        
         self.pwm = PCA9685(PCA9685_ADDRESS)
         self.pwm.set_pwm_freq(PWM_FREQUENCY)
         self.positions: Dict[int, int] = {}
+        self._positions_view = MappingProxyType(self.positions)
         
         # Use provided config or create default
         if config_store is not None:
@@ -36,7 +49,18 @@ class ServoController:
         else:
             self.config = ServoConfigStore(num_servos=num_servos)
         
-        # Initialize all servos to their center positions
+        # Bumped on every config change so callers can cache derived data
+        self.config_version = 0
+        
+        # Per-channel pulse limits for vectorized clamping in set_positions,
+        # and the serialized configs, both refreshed in one config pass
+        self._min_pulse = np.full(NUM_CHANNELS, MIN_PULSE, dtype=np.int32)
+        self._max_pulse = np.full(NUM_CHANNELS, MAX_PULSE, dtype=np.int32)
+        self._config_dicts: Dict[int, Dict[str, Any]] = {}
+        self._rebuild_limits()
+        
+        # Initialize all servos to their center positions; center_all sends
+        # every channel in a single auto-increment burst
         self.center_all()
 
     @property
@@ -50,7 +74,31 @@ class ServoController:
 
     def set_servo_config(self, channel: int, settings: ServoSettings) -> None:
         """Update configuration for a servo."""
-        self.config.set_servo(channel, settings)
+        with self._lock:
+            self.config.set_servo(channel, settings)
+            self._rebuild_limits()
+
+    def get_all_configs(self) -> Dict[int, Dict[str, Any]]:
+        """Get the configuration dicts of all servos, keyed by channel.
+        
+        The result is rebuilt only when the config changes (see
+        config_version) and is shared between callers; don't mutate it.
+        """
+        return self._config_dicts
+
+    def _rebuild_limits(self) -> None:
+        """Refresh the cached limit arrays and config dicts from the servo config."""
+        self.config_version += 1
+        num_servos = self.config.num_servos
+        config_dicts = {}
+        for channel in range(NUM_CHANNELS):
+            # Read servos directly: get_servo() would add config entries
+            settings = self.config.servos.get(channel)
+            self._min_pulse[channel] = settings.min_pulse if settings else MIN_PULSE
+            self._max_pulse[channel] = settings.max_pulse if settings else MAX_PULSE
+            if channel < num_servos:
+                config_dicts[channel] = (settings or self.config.get_servo(channel)).to_dict()
+        self._config_dicts = config_dicts
 
     def set_position(self, channel: int, position: int) -> int:
         """Set a servo to a specific position.
@@ -70,11 +118,42 @@ class ServoController:
         # Clamp position to servo's configured range
         position = max(min_pos, min(max_pos, position))
         
-        self.pwm.set_servo_pulse(channel, position)
-        self.positions[channel] = position
+        with self._lock:
+            self.pwm.set_servo_pulse(channel, position)
+            self.positions[channel] = position
         
         return position
 
+    def set_positions(self, positions: Dict[int, int]) -> Dict[int, int]:
+        """Set several servos at once, batching the I2C writes.
+        
+        Channels outside 0-15 are dropped rather than indexed, where they
+        would raise (>= 16) or wrap around to another channel (negative).
+        
+        Args:
+            positions: Dictionary mapping channel (0-15) to pulse width in microseconds
+            
+        Returns:
+            Dictionary of the clamped positions that were set
+        """
+        count = len(positions)
+        channels = np.fromiter(positions.keys(), dtype=np.intp, count=count)
+        values = np.fromiter(positions.values(), dtype=np.int32, count=count)
+        
+        in_range = (channels >= 0) & (channels < NUM_CHANNELS)
+        if not in_range.all():
+            channels = channels[in_range]
+            values = values[in_range]
+        
+        with self._lock:
+            np.clip(values, self._min_pulse[channels], self._max_pulse[channels], out=values)
+            clamped = dict(zip(channels.tolist(), values.tolist()))
+            
+            self.pwm.set_servo_pulses(clamped)
+            self.positions.update(clamped)
+        
+        return clamped
+
     def get_position(self, channel: int) -> int:
         """Get the current position of a servo.
         
@@ -87,19 +166,25 @@ class ServoController:
         servo_config = self.config.get_servo(channel)
         return self.positions.get(channel, servo_config.center_pulse)
 
-    def get_all_positions(self) -> Dict[int, int]:
+    def get_all_positions(self, copy: bool = False) -> Mapping[int, int]:
         """Get positions of all servos.
         
+        Args:
+            copy: Return a mutable dict snapshot instead of the live view
+        
         Returns:
-            Dictionary mapping channel to position
+            Read-only live mapping of channel to position, or a dict if copy
         """
-        return self.positions.copy()
+        if copy:
+            return self.positions.copy()
+        return self._positions_view
 
     def center_all(self) -> None:
         """Move all servos to their configured center positions."""
-        for i in range(self.num_servos):
-            servo_config = self.config.get_servo(i)
-            self.set_position(i, servo_config.center_pulse)
+        self.set_positions({
+            i: self.config.get_servo(i).center_pulse
+            for i in range(self.num_servos)
+        })
 
     def center_servo(self, channel: int) -> int:
         """Move a single servo to its configured center position."""
@@ -113,20 +198,29 @@ class ServoController:
             num_servos: New number of servos (1-16)
         """
         num_servos = max(1, min(16, num_servos))
-        old_count = self.num_servos
-        
-        self.config.set_num_servos(num_servos)
         
-        # Initialize new servos to their center
-        for i in range(old_count, num_servos):
-            servo_config = self.config.get_servo(i)
-            self.set_position(i, servo_config.center_pulse)
-        
-        # Remove positions for servos that no longer exist
-        for i in list(self.positions.keys()):
-            if i >= num_servos:
-                del self.positions[i]
+        with self._lock:
+            old_count = self.num_servos
+            
+            self.config.set_num_servos(num_servos)
+            self._rebuild_limits()
+            
+            # Initialize new servos to their center in one block write
+            if num_servos > old_count:
+                self.set_positions({
+                    i: self.config.get_servo(i).center_pulse
+                    for i in range(old_count, num_servos)
+                })
+            
+            # Remove positions for servos that no longer exist
+            for i in list(self.positions.keys()):
+                if i >= num_servos:
+                    del self.positions[i]
 
     def save_config(self) -> None:
         """Save the servo configuration to disk."""
         self.config.save()
+
+    def schedule_save(self) -> None:
+        """Save the servo configuration shortly, coalescing rapid changes."""
+        self.config.mark_dirty()
@@ -1,9 +1,11 @@
 """Per-servo configuration with persistent storage."""
 
 import json
+import os
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field, fields
 
 from .config import MIN_PULSE, MAX_PULSE, CENTER_PULSE
 
@@ -16,6 +18,9 @@ DEFAULT_COLORS = [
     "#1dd1a1", "#5f27cd", "#ff9ff3", "#54a0ff",
 ]
 
+# Coalescing window for mark_dirty() saves, in seconds
+SAVE_DEBOUNCE_SEC = 0.5
+
 
 @dataclass
 class ServoSettings:
@@ -27,17 +32,18 @@ class ServoSettings:
     color: str = ""  # Empty means use default color based on index
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Fields are plain scalars, so skip asdict()'s recursive deep copy
+        return {
+            "name": self.name,
+            "min_pulse": self.min_pulse,
+            "max_pulse": self.max_pulse,
+            "center_pulse": self.center_pulse,
+            "color": self.color,
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ServoSettings":
-        return cls(
-            name=data.get("name", ""),
-            min_pulse=data.get("min_pulse", MIN_PULSE),
-            max_pulse=data.get("max_pulse", MAX_PULSE),
-            center_pulse=data.get("center_pulse", CENTER_PULSE),
-            color=data.get("color", ""),
-        )
+        return cls(**{name: data.get(name, default) for name, default in _SERVO_FIELDS})
     
     @staticmethod
     def get_default_color(index: int) -> str:
@@ -45,6 +51,10 @@ class ServoSettings:
         return DEFAULT_COLORS[index % len(DEFAULT_COLORS)]
 
 
+# (name, default) for each ServoSettings field, resolved once at import
+_SERVO_FIELDS = tuple((f.name, f.default) for f in fields(ServoSettings))
+
+
 @dataclass 
 class ServoConfigStore:
     """Manages persistent servo configuration."""
@@ -54,6 +64,17 @@ class ServoConfigStore:
     audio_offset_ms: int = 150  # Audio sync offset in milliseconds
     current_audio_file: str = ""  # Filename of currently selected audio
     _config_path: Optional[Path] = field(default=None, repr=False)
+    # Guards servos/num_servos so the save timer serializes a consistent
+    # snapshot while request threads edit them
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+    _save_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+    _save_timer: Optional[threading.Timer] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def __post_init__(self):
         # Ensure all servos have settings
@@ -63,28 +84,34 @@ class ServoConfigStore:
     
     def get_servo(self, channel: int) -> ServoSettings:
         """Get settings for a servo, creating defaults if needed."""
-        if channel not in self.servos:
-            self.servos[channel] = ServoSettings(name=f"Servo {channel}")
-        return self.servos[channel]
+        settings = self.servos.get(channel)
+        if settings is None:
+            with self._lock:
+                settings = self.servos.setdefault(
+                    channel, ServoSettings(name=f"Servo {channel}")
+                )
+        return settings
     
     def set_servo(self, channel: int, settings: ServoSettings) -> None:
         """Update settings for a servo."""
-        self.servos[channel] = settings
+        with self._lock:
+            self.servos[channel] = settings
     
     def set_num_servos(self, count: int) -> None:
         """Change the number of servos."""
         count = max(1, min(16, count))
-        self.num_servos = count
-        
-        # Add missing servos
-        for i in range(count):
-            if i not in self.servos:
-                self.servos[i] = ServoSettings(name=f"Servo {i}")
-        
-        # Remove extra servos
-        for i in list(self.servos.keys()):
-            if i >= count:
-                del self.servos[i]
+        with self._lock:
+            self.num_servos = count
+            
+            # Add missing servos
+            for i in range(count):
+                if i not in self.servos:
+                    self.servos[i] = ServoSettings(name=f"Servo {i}")
+            
+            # Remove extra servos
+            for i in list(self.servos.keys()):
+                if i >= count:
+                    del self.servos[i]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -114,15 +141,65 @@ class ServoConfigStore:
         )
     
     def save(self, path: Optional[Path] = None) -> None:
-        """Save configuration to JSON file."""
+        """Save configuration to JSON file immediately.
+        
+        Any pending mark_dirty() save is folded into this one.
+        """
         path = path or self._config_path
         if path is None:
             raise ValueError("No config path specified")
         
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "w") as f:
-            json.dump(self.to_dict(), f, indent=2)
-        self._config_path = path
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            
+            path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Serialize up front and write once to a temp file, then rename
+            # over the target so a crash mid-write can't truncate the config
+            with self._lock:
+                snapshot = self.to_dict()
+            data = json.dumps(snapshot, indent=2).encode()
+            tmp = path.with_suffix(path.suffix + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._config_path = path
+    
+    def mark_dirty(self) -> None:
+        """Schedule a save, coalescing changes made within SAVE_DEBOUNCE_SEC.
+        
+        Each call restarts the window, so a burst of updates (e.g. a slider
+        drag) is written once after it settles. A store with no config
+        path has nowhere to write, so nothing is scheduled.
+        """
+        if self._config_path is None:
+            return
+        # Non-daemon so a pending save still lands if the process exits
+        self._arm_save_timer(daemon=False)
+    
+    def _arm_save_timer(self, daemon: bool) -> None:
+        """(Re)start the debounce timer for a pending save."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DEBOUNCE_SEC, self._flush)
+            self._save_timer.daemon = daemon
+            self._save_timer.start()
+    
+    def _flush(self) -> None:
+        """Write a pending debounced save (runs on the timer thread).
+        
+        A failed save is retried after another debounce window, on a daemon
+        timer so a persistent failure can't hold the process open at exit.
+        """
+        try:
+            self.save()
+        except Exception as e:
+            print(f"Failed to save config: {e!r}")
+            # Try again later, unless there is nowhere to write it
+            if self._config_path is not None:
+                self._arm_save_timer(daemon=True)
     
     @classmethod
     def load(cls, path: Path) -> "ServoConfigStore":
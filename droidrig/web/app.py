@@ -1,14 +1,81 @@
 """Flask web application for DroidRig."""
 
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from flask import Flask, jsonify, request, render_template, send_from_directory
+from typing import Any, Dict
+
+import numpy as np
+import orjson
+from flask import Flask, Response, jsonify, request, render_template, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    from flask_compress import Compress
+    HAS_COMPRESS = True
+except ImportError:
+    HAS_COMPRESS = False
 
 from ..config import CENTER_PULSE, MIN_PULSE, MAX_PULSE
 from ..servo_config import ServoSettings
 from ..hardware.servo import ServoController
 from ..animation.animator import Animator
 from ..animation.storage import AnimationStore, SavedAnimation
-from ..audio.player import AudioPlayer
+from ..audio.player import AUDIO_EXTENSIONS, AudioPlayer
+
+
+# Cache lifetime for served audio files (one year)
+AUDIO_FILE_MAX_AGE = 31536000
+
+
+def _sample_curve(points: list, times: np.ndarray, default: int) -> np.ndarray:
+    """Linearly interpolate a curve's pulse values at each of the given times.
+    
+    Times before the first point or after the last hold that point's value.
+    """
+    if not points:
+        return np.full(len(times), default, dtype=np.int64)
+    
+    points = sorted(points, key=lambda p: p["time"])
+    xp = np.fromiter((p["time"] for p in points), dtype=np.float64, count=len(points))
+    fp = np.fromiter((p["pulse"] for p in points), dtype=np.float64, count=len(points))
+    return np.rint(np.interp(times, xp, fp)).astype(np.int64)
+
+
+def _json_object() -> Dict[str, Any] | None:
+    """Return the request's JSON object body, or None for a non-object.
+    
+    Missing, non-JSON and malformed bodies give {} so routes apply their
+    defaults; only valid JSON that isn't an object (a list, a string...)
+    gives None, which routes reject with a 400.
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        return {}
+    return data if isinstance(data, dict) else None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for jsonify() and request parsing."""
+    
+    # int dict keys (servo channels) are written as strings, like json does,
+    # and numpy arrays/scalars are encoded natively without .tolist()
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Hand the encoded bytes straight to the response, skipping the
+        # str round trip the default provider makes
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype,
+        )
 
 
 def create_app(
@@ -31,6 +98,14 @@ def create_app(
         template_folder="templates",
         static_folder="static",
     )
+    app.json = OrjsonProvider(app)
+    
+    # Compress JSON/HTML/JS responses when flask-compress is installed
+    # (audio files aren't in its mimetype list, so they're sent as-is)
+    if HAS_COMPRESS:
+        app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+        app.config["COMPRESS_MIN_SIZE"] = 512
+        Compress(app)
     
     # Create audio player if not provided
     # Pass config_store for persistent audio settings
@@ -42,29 +117,53 @@ def create_app(
     
     # Create animation store for saving/loading animations
     animation_store = AnimationStore()
+    
+    # Waveform extraction runs off the request thread; in-flight jobs are
+    # tracked by filename until they finish (results land in the sidecar)
+    waveform_executor = ThreadPoolExecutor(max_workers=2)
+    pending_waveforms: Dict[str, Future] = {}
 
-    def get_all_servo_configs():
-        """Get configuration for all servos."""
-        return {
-            i: servo.get_servo_config(i).to_dict()
-            for i in range(servo.num_servos)
-        }
+    def submit_waveform(filepath: Path) -> None:
+        """Start extracting a file's waveform in the background."""
+        future = waveform_executor.submit(audio_player.get_waveform_data, filepath, 200)
+        pending_waveforms[filepath.name] = future
+        future.add_done_callback(lambda _: pending_waveforms.pop(filepath.name, None))
 
     @app.route("/")
     def index():
         """Serve the animations overview page."""
         return render_template("animations.html")
 
+    # Pre-encoded 409 bodies for requests rejected mid-animation. A fresh
+    # Response wraps them each time, since after_request handlers (e.g.
+    # compression) modify the response object in place.
+    busy_body = orjson.dumps({"status": "busy", "message": "Animation in progress"})
+    already_busy_body = orjson.dumps(
+        {"status": "busy", "message": "Animation already in progress"}
+    )
+
+    def busy_response(body: bytes = busy_body) -> Response:
+        """Build the 409 response for a request that conflicts with an animation."""
+        return app.response_class(body, status=409, mimetype="application/json")
+
+    # Rendered editor page, keyed by the servo config version it used
+    editor_cache = {"version": None, "html": None}
+
     @app.route("/editor")
     def editor():
         """Serve the curve-based animation editor."""
-        return render_template(
-            "editor.html",
-            num_servos=servo.num_servos,
-            min_pulse=MIN_PULSE,
-            max_pulse=MAX_PULSE,
-            center_pulse=CENTER_PULSE,
-        )
+        # Re-render only when the config changes (or always while templates
+        # auto-reload, so edits show up during development)
+        if editor_cache["version"] != servo.config_version or app.jinja_env.auto_reload:
+            editor_cache["html"] = render_template(
+                "editor.html",
+                num_servos=servo.num_servos,
+                min_pulse=MIN_PULSE,
+                max_pulse=MAX_PULSE,
+                center_pulse=CENTER_PULSE,
+            )
+            editor_cache["version"] = servo.config_version
+        return editor_cache["html"]
 
     @app.route("/api")
     def api_info():
@@ -88,9 +187,11 @@ def create_app(
     def set_servo():
         """Set a single servo position."""
         if animator.is_animating:
-            return jsonify({"status": "busy", "message": "Animation in progress"}), 409
+            return busy_response()
 
-        data = request.get_json()
+        data = _json_object()
+        if data is None:
+            return jsonify({"status": "error", "message": "Expected a JSON object"}), 400
         channel = int(data.get("channel", 0))
         
         # Use servo's configured center as default
@@ -120,36 +221,32 @@ def create_app(
 
         # POST: update servo config
         if animator.is_animating:
-            return jsonify({"status": "busy", "message": "Animation in progress"}), 409
+            return busy_response()
 
-        data = request.get_json()
+        data = _json_object()
+        if data is None:
+            return jsonify({"status": "error", "message": "Expected a JSON object"}), 400
         current = servo.get_servo_config(channel)
         
+        # Clamp limits to the global range and the center into the limits
+        min_pulse = max(MIN_PULSE, int(data.get("min_pulse", current.min_pulse)))
+        max_pulse = min(MAX_PULSE, int(data.get("max_pulse", current.max_pulse)))
+        if min_pulse >= max_pulse:
+            return jsonify({"status": "error", "message": "min must be less than max"}), 400
+        center_pulse = min(max_pulse, max(min_pulse, int(data.get("center_pulse", current.center_pulse))))
+        
         new_settings = ServoSettings(
             name=data.get("name", current.name),
-            min_pulse=int(data.get("min_pulse", current.min_pulse)),
-            max_pulse=int(data.get("max_pulse", current.max_pulse)),
-            center_pulse=int(data.get("center_pulse", current.center_pulse)),
+            min_pulse=min_pulse,
+            max_pulse=max_pulse,
+            center_pulse=center_pulse,
             color=data.get("color", current.color),
         )
         
-        # Validate ranges
-        if new_settings.min_pulse < MIN_PULSE:
-            new_settings.min_pulse = MIN_PULSE
-        if new_settings.max_pulse > MAX_PULSE:
-            new_settings.max_pulse = MAX_PULSE
-        if new_settings.min_pulse >= new_settings.max_pulse:
-            return jsonify({"status": "error", "message": "min must be less than max"}), 400
-        if not (new_settings.min_pulse <= new_settings.center_pulse <= new_settings.max_pulse):
-            new_settings.center_pulse = (new_settings.min_pulse + new_settings.max_pulse) // 2
-        
         servo.set_servo_config(channel, new_settings)
         
-        # Auto-save to config file
-        try:
-            servo.save_config()
-        except Exception:
-            pass  # Don't fail if save doesn't work
+        # Auto-save to config file (debounced, so slider drags write once)
+        servo.schedule_save()
         
         return jsonify({
             "status": "ok",
@@ -161,7 +258,7 @@ def create_app(
     def trigger_animation():
         """Trigger the preset animation sequence."""
         if animator.is_animating:
-            return jsonify({"status": "busy", "message": "Animation already in progress"}), 409
+            return busy_response(already_busy_body)
 
         animator.play_preset_async()
         return jsonify({"status": "started", "message": "Animation sequence started"})
@@ -170,9 +267,11 @@ def create_app(
     def play_custom():
         """Play custom keyframe animation."""
         if animator.is_animating:
-            return jsonify({"status": "busy", "message": "Animation already in progress"}), 409
+            return busy_response(already_busy_body)
 
-        data = request.get_json()
+        data = _json_object()
+        if data is None:
+            return jsonify({"status": "error", "message": "Expected a JSON object"}), 400
         keyframes_data = data.get("keyframes", [])
 
         if not keyframes_data:
@@ -190,20 +289,54 @@ def create_app(
         animator.stop()
         return jsonify({"status": "ok", "message": "Stop signal sent"})
 
+    # Mixed into /status ETags: config_version restarts with the process,
+    # so without it a tag cached before a restart could match new state
+    status_etag_nonce = int.from_bytes(os.urandom(8), "little")
+
     @app.route("/status", methods=["GET"])
     def get_status():
-        """Get current animation status and servo positions."""
-        return jsonify({
-            "animating": animator.is_animating,
-            "positions": servo.get_all_positions(),
-            "servos": get_all_servo_configs(),
-        })
+        """Get current animation status and servo positions.
+        
+        Tagged with an ETag over the state it reports, so unchanged polls
+        are answered with 304 before any payload is built.
+        """
+        animating = animator.is_animating
+        positions = servo.get_all_positions(copy=True)
+        etag = format(
+            hash((
+                status_etag_nonce,
+                animating,
+                tuple(positions.items()),
+                servo.config_version,
+            )) & (2**64 - 1),
+            "016x",
+        )
+        
+        # flask-compress re-tags compressed bodies as "<tag>:gzip" or
+        # "<tag>:br", so compare the client's tags without that suffix
+        client_tags = {
+            tag.partition(":")[0]
+            for tag in request.if_none_match.as_set(include_weak=True)
+        }
+        if etag in client_tags:
+            response = app.response_class(status=304)
+        else:
+            response = jsonify({
+                "animating": animating,
+                # JSON encoders need a real dict, not the read-only view
+                "positions": positions,
+                "servos": servo.get_all_configs(),
+            })
+        response.set_etag(etag)
+        # Let the browser cache it, but revalidate on every poll
+        response.cache_control.no_cache = True
+        return response
 
     @app.route("/center", methods=["POST"])
     def center_servos():
         """Return all servos to center position."""
         if animator.is_animating:
-            return jsonify({"status": "busy", "message": "Animation in progress"}), 409
+            return busy_response()
 
         servo.center_all()
         return jsonify({"status": "ok", "message": "Servos centered"})
@@ -217,23 +350,22 @@ def create_app(
                 "globalMinPulse": MIN_PULSE,
                 "globalMaxPulse": MAX_PULSE,
                 "globalCenterPulse": CENTER_PULSE,
-                "servos": get_all_servo_configs(),
+                "servos": servo.get_all_configs(),
             })
 
         # POST: update config
         if animator.is_animating:
-            return jsonify({"status": "busy", "message": "Animation in progress"}), 409
+            return busy_response()
 
-        data = request.get_json()
+        data = _json_object()
+        if data is None:
+            return jsonify({"status": "error", "message": "Expected a JSON object"}), 400
         if "numServos" in data:
             new_count = int(data["numServos"])
             servo.set_num_servos(new_count)
             
-            # Auto-save to config file
-            try:
-                servo.save_config()
-            except Exception:
-                pass  # Don't fail if save doesn't work
+            # Auto-save to config file (debounced)
+            servo.schedule_save()
 
         return jsonify({
             "status": "ok",
@@ -241,7 +373,7 @@ def create_app(
             "globalMinPulse": MIN_PULSE,
             "globalMaxPulse": MAX_PULSE,
             "globalCenterPulse": CENTER_PULSE,
-            "servos": get_all_servo_configs(),
+            "servos": servo.get_all_configs(),
         })
 
     @app.route("/config/save", methods=["POST"])
@@ -265,17 +397,16 @@ def create_app(
             return jsonify({"status": "error", "message": "No file selected"}), 400
         
         # Check file extension
-        allowed_extensions = {".wav", ".mp3", ".ogg", ".flac"}
-        ext = Path(file.filename).suffix.lower()
-        if ext not in allowed_extensions:
+        if not file.filename.lower().endswith(AUDIO_EXTENSIONS):
             return jsonify({
                 "status": "error",
-                "message": f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
+                "message": f"Invalid file type. Allowed: {', '.join(AUDIO_EXTENSIONS)}"
             }), 400
         
         try:
             # Save the file
-            filepath = audio_player.save_audio(file.read(), file.filename)
+            # Stream straight from the upload to disk
+            filepath = audio_player.save_audio(file.stream, file.filename)
             
             # Set as current audio
             audio_player.set_current_audio(filepath)
@@ -283,14 +414,16 @@ def create_app(
             # Get duration
             duration_ms = audio_player.get_audio_duration_ms(filepath)
             
-            # Get waveform data for visualization
-            waveform = audio_player.get_waveform_data(filepath, num_samples=200)
+            # Decode the waveform in the background; the client fetches it
+            # from /audio/waveform/<filename>
+            submit_waveform(filepath)
             
             return jsonify({
                 "status": "ok",
                 "filename": filepath.name,
                 "duration_ms": duration_ms,
-                "waveform": waveform,
+                "waveform": [],
+                "waveform_pending": True,
             })
         except Exception as e:
             return jsonify({"status": "error", "message": str(e)}), 500
@@ -312,18 +445,23 @@ def create_app(
                 "has_audio": False,
             })
         
+        # Don't decode in the request while a background job is on it
+        pending = filepath.name in pending_waveforms
         return jsonify({
             "status": "ok",
             "has_audio": True,
             "filename": filepath.name,
             "duration_ms": audio_player.get_audio_duration_ms(filepath),
-            "waveform": audio_player.get_waveform_data(filepath, num_samples=200),
+            "waveform": [] if pending else audio_player.get_waveform_data(filepath, num_samples=200),
+            "waveform_pending": pending,
         })
 
     @app.route("/audio/select", methods=["POST"])
     def select_audio():
         """Select an existing audio file by filename."""
-        data = request.get_json()
+        data = _json_object()
+        if data is None:
+            return jsonify({"status": "error", "message": "Expected a JSON object"}), 400
         filename = data.get("filename", "").strip()
         
         if not filename:
@@ -350,14 +488,48 @@ def create_app(
     @app.route("/audio/file/<filename>")
     def serve_audio_file(filename: str):
         """Serve an audio file for browser playback."""
-        return send_from_directory(audio_player.audio_dir, filename)
+        # Uploads never overwrite an existing name, so a filename's content
+        # is fixed; let the browser keep it. Conditional/Range requests are
+        # still answered (ETag + Last-Modified) for seeking and revalidation.
+        response = send_from_directory(
+            audio_player.audio_dir, filename, conditional=True, max_age=AUDIO_FILE_MAX_AGE
+        )
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
 
     @app.route("/audio/list", methods=["GET"])
     def list_audio_files():
-        """List all available audio files."""
+        """List all available audio files (durations only with ?duration=1)."""
+        with_duration = request.args.get("duration", "").lower() in ("1", "true")
+        return jsonify({
+            "status": "ok",
+            "files": audio_player.list_audio_files(with_duration=with_duration),
+        })
+
+    @app.route("/audio/info/<filename>", methods=["GET"])
+    def get_audio_info(filename: str):
+        """Get info about a single audio file, including its duration."""
+        info = audio_player.get_audio_info(filename)
+        if info is None:
+            return jsonify({"status": "error", "message": "Audio file not found"}), 404
+        
+        return jsonify({"status": "ok", **info})
+
+    @app.route("/audio/waveform/<filename>", methods=["GET"])
+    def get_audio_waveform(filename: str):
+        """Get waveform data for an audio file, once it has been extracted."""
+        if filename in pending_waveforms:
+            return jsonify({"status": "processing"}), 202
+        
+        filepath = audio_player.audio_dir / Path(filename).name
+        if not filepath.is_file():
+            return jsonify({"status": "error", "message": "Audio file not found"}), 404
+        
         return jsonify({
             "status": "ok",
-            "files": audio_player.list_audio_files(),
+            "filename": filepath.name,
+            "waveform": audio_player.get_waveform_data(filepath, num_samples=200),
         })
 
     @app.route("/audio/offset", methods=["GET", "POST"])
@@ -370,15 +542,14 @@ def create_app(
             })
         
         # POST: update offset
-        data = request.get_json()
+        data = _json_object()
+        if data is None:
+            return jsonify({"status": "error", "message": "Expected a JSON object"}), 400
         offset = int(data.get("offset_ms", 150))
         audio_player.audio_offset_ms = offset  # Property handles clamping
         
-        # Auto-save to config file
-        try:
-            servo.save_config()
-        except Exception:
-            pass  # Don't fail if save doesn't work
+        # Auto-save to config file (debounced, so slider drags write once)
+        servo.schedule_save()
         
         return jsonify({
             "status": "ok",
@@ -398,7 +569,9 @@ def create_app(
     @app.route("/animations/save", methods=["POST"])
     def save_animation():
         """Save an animation."""
-        data = request.get_json()
+        data = _json_object()
+        if data is None:
+            return jsonify({"status": "error", "message": "Expected a JSON object"}), 400
         
         name = data.get("name", "").strip()
         if not name:
@@ -438,9 +611,11 @@ def create_app(
         if not animation:
             return jsonify({"status": "error", "message": "Animation not found"}), 404
         
+        # orjson encodes the dataclass directly, so the curves aren't
+        # deep-copied into an intermediate dict by to_dict()/asdict()
         return jsonify({
             "status": "ok",
-            "animation": animation.to_dict(),
+            "animation": animation,
         })
 
     @app.route("/animations/delete/<filename>", methods=["POST"])
@@ -463,25 +638,30 @@ def create_app(
     def play_saved_animation(filename: str):
         """Play a saved animation by filename."""
         if animator.is_animating:
-            return jsonify({"status": "busy", "message": "Animation already in progress"}), 409
+            return busy_response(already_busy_body)
         
         animation = animation_store.load_by_filename(filename)
         if not animation:
             return jsonify({"status": "error", "message": "Animation not found"}), 404
         
-        # Generate keyframes from curves
-        keyframes = []
+        # Generate keyframes from curves, sampling every curve at once
         sample_interval = 50  # ms
-        
-        for t in range(0, animation.duration_ms + 1, sample_interval):
-            servos = {}
-            for servo_id, points in animation.curves.items():
-                servos[servo_id] = _get_value_at_time(points, t, CENTER_PULSE)
-            
-            keyframes.append({
-                "servos": servos,
-                "duration": sample_interval,
-            })
+        sample_times = np.arange(0, animation.duration_ms + 1, sample_interval)
+        
+        servo_ids = list(animation.curves)
+        if servo_ids:
+            # One row per sample time, one column per servo
+            rows = np.column_stack([
+                _sample_curve(animation.curves[servo_id], sample_times, CENTER_PULSE)
+                for servo_id in servo_ids
+            ]).tolist()
+        else:
+            rows = [[] for _ in sample_times]
+        
+        keyframes = [
+            {"servos": dict(zip(servo_ids, row)), "duration": sample_interval}
+            for row in rows
+        ]
         
         if not keyframes:
             return jsonify({"status": "error", "message": "Animation has no data"}), 400
@@ -503,29 +683,4 @@ def create_app(
             "has_audio": with_audio,
         })
 
-    def _get_value_at_time(points: list, time: int, default: int) -> int:
-        """Interpolate curve value at a given time."""
-        if not points:
-            return default
-        
-        before = None
-        after = None
-        
-        for p in points:
-            if p["time"] <= time:
-                before = p
-            elif after is None:
-                after = p
-        
-        if not before and not after:
-            return default
-        if not before:
-            return after["pulse"]
-        if not after:
-            return before["pulse"]
-        
-        # Linear interpolation
-        t = (time - before["time"]) / (after["time"] - before["time"])
-        return round(before["pulse"] + (after["pulse"] - before["pulse"]) * t)
-
     return app
@@ -126,12 +126,34 @@ async function loadCurrentAudio() {
             audioElement = new Audio(`/audio/file/${data.filename}`);
             
             updateAudioUI();
+            if (data.waveform_pending) fetchPendingWaveform(data.filename);
         }
     } catch (e) {
         console.error('Failed to load audio:', e);
     }
 }
 
+// Poll for a waveform the server is still extracting in the background
+async function fetchPendingWaveform(filename) {
+    try {
+        while (audioFile && audioFile.filename === filename) {
+            const res = await fetch(`/audio/waveform/${encodeURIComponent(filename)}`);
+            if (res.status === 202) {
+                await new Promise(resolve => setTimeout(resolve, 250));
+                continue;
+            }
+            const data = await res.json();
+            if (data.status === 'ok' && audioFile && audioFile.filename === filename) {
+                audioFile.waveform = data.waveform || [];
+                render();
+            }
+            return;
+        }
+    } catch (e) {
+        console.error('Failed to load waveform:', e);
+    }
+}
+
 function setupAudioEventListeners() {
     const fileInput = document.getElementById('audioFileInput');
     const container = document.getElementById('audioContainer');
@@ -264,6 +286,7 @@ async function uploadAudioFile(file) {
             
             updateAudioUI();
             render();
+            if (data.waveform_pending) fetchPendingWaveform(data.filename);
             
             log(`Audio loaded: ${formatTime(data.duration_ms)}`, 'success');
         } else {
@@ -2040,6 +2063,7 @@ async function loadAnimationFromUrl() {
                     };
                     audioElement = new Audio(`/audio/file/${audioData.filename}`);
                     updateAudioUI();
+                    if (audioData.waveform_pending) fetchPendingWaveform(audioData.filename);
                 }
             } catch (e) {
                 console.log('Could not load audio:', e);
@@ -4,12 +4,18 @@
 import argparse
 from pathlib import Path
 
-from droidrig.config import HOST, PORT
+from droidrig.config import HOST, PORT, SERVER_THREADS
 from droidrig.servo_config import ServoConfigStore
 from droidrig.hardware import ServoController
 from droidrig.animation import Animator
 from droidrig.web import create_app
 
+try:
+    from waitress import serve
+    HAS_WAITRESS = True
+except ImportError:
+    HAS_WAITRESS = False
+
 # Default config file location
 CONFIG_FILE = Path(__file__).parent / "servo_config.json"
 
@@ -55,8 +61,13 @@ def main():
     print("  Or use your Pi's IP address from other devices")
     print("=" * 50)
     
-    # Run server
-    app.run(host=HOST, port=args.port)
+    # Run server: waitress when installed (one process, since the servo
+    # hardware state can't be shared, with a pool of request threads)
+    if HAS_WAITRESS:
+        serve(app, host=HOST, port=args.port, threads=SERVER_THREADS)
+    else:
+        print("  (waitress not installed, using Flask's development server)")
+        app.run(host=HOST, port=args.port, threaded=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,39 @@
+"""Shared fixtures for the droidrig test suite."""
+
+from typing import Dict, List
+
+import pytest
+
+from droidrig.hardware import servo as servo_module
+from droidrig.hardware.servo import ServoController
+from droidrig.servo_config import ServoConfigStore
+
+
+class FakePCA9685:
+    """Stands in for the I2C driver so tests run without /dev/i2c-*."""
+
+    def __init__(self, address: int = 0x40, debug: bool = False, bus: int = 1):
+        self.writes: List[Dict[int, int]] = []
+
+    def set_pwm_freq(self, freq: int) -> None:
+        pass
+
+    def set_servo_pulse(self, channel: int, pulse: int) -> None:
+        self.writes.append({channel: pulse})
+
+    def set_servo_pulses(self, pulses: Dict[int, int]) -> None:
+        self.writes.append(dict(pulses))
+
+
+@pytest.fixture
+def make_servo(monkeypatch, tmp_path):
+    """Build a ServoController on a fake PCA9685 with a temporary config file."""
+    monkeypatch.setattr(servo_module, "PCA9685", FakePCA9685)
+
+    def make(num_servos: int = 2) -> ServoController:
+        store = ServoConfigStore(
+            num_servos=num_servos, _config_path=tmp_path / "servo_config.json"
+        )
+        return ServoController(config_store=store)
+
+    return make
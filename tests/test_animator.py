@@ -0,0 +1,46 @@
+"""Tests for keyframe playback."""
+
+import time
+
+from droidrig.animation.animator import Animator
+
+
+class FakeAudioPlayer:
+    """Records play() calls; reports a fixed latency offset."""
+
+    current_audio_file = "clip.wav"
+
+    def __init__(self, latency_sec: float):
+        self.latency_sec = latency_sec
+        self.play_times = []
+
+    def get_latency_offset_sec(self) -> float:
+        return self.latency_sec
+
+    def play(self, wait_for_start: bool = True) -> bool:
+        self.play_times.append(time.perf_counter())
+        return True
+
+
+def test_negative_offset_longer_than_animation_still_plays_audio(make_servo):
+    audio = FakeAudioPlayer(latency_sec=-0.2)
+    animator = Animator(make_servo(), audio_player=audio)
+
+    started = time.perf_counter()
+    assert animator.play_keyframes([{"servos": {"0": 1600}, "duration": 100}])
+
+    assert len(audio.play_times) == 1
+    assert audio.play_times[0] - started >= 0.2
+
+
+def test_keyframes_start_from_current_position_beyond_num_servos(make_servo):
+    servo = make_servo(num_servos=2)
+    servo.set_position(5, 1000)
+    servo.pwm.writes.clear()
+    animator = Animator(servo)
+
+    assert animator.play_keyframes([{"servos": {"5": 1200}, "duration": 40}], with_audio=False)
+
+    # The ramp starts at 1000, not at the center pulse
+    assert servo.pwm.writes[0][5] <= 1050
+    assert servo.get_position(5) == 1200
@@ -0,0 +1,80 @@
+"""Tests for the Flask routes."""
+
+import pytest
+
+from droidrig.animation.animator import Animator
+from droidrig.audio.player import AudioPlayer
+from droidrig.web import app as app_module
+
+
+@pytest.fixture
+def make_client(make_servo, tmp_path):
+    """Build a test client around a fake-hardware servo controller."""
+
+    def make(num_servos: int = 2):
+        servo = make_servo(num_servos)
+        animator = Animator(servo)
+        audio_player = AudioPlayer(audio_dir=tmp_path / "audio", config_store=servo.config)
+        app = app_module.create_app(servo, animator, audio_player)
+        return app.test_client()
+
+    return make
+
+
+def test_status_revalidates_with_etag(make_client):
+    client = make_client()
+    first = client.get("/status")
+    assert first.status_code == 200
+
+    again = client.get("/status", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_status_revalidates_compressed_etag(make_client):
+    pytest.importorskip("flask_compress")
+    assert app_module.HAS_COMPRESS
+
+    # Enough servos to push the body past COMPRESS_MIN_SIZE
+    client = make_client(num_servos=8)
+    # Newer flask-compress re-evaluates the request itself after compressing;
+    # turn that off so the 304 has to come from the route's own check
+    client.application.config["COMPRESS_EVALUATE_CONDITIONAL_REQUEST"] = False
+    first = client.get("/status", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert first.headers["ETag"].endswith(':gzip"')
+
+    again = client.get(
+        "/status",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]},
+    )
+    assert again.status_code == 304
+
+
+def test_audio_offset_defaults_without_json_body(make_client):
+    client = make_client()
+    client.post("/audio/offset", json={"offset_ms": 300})
+
+    response = client.post("/audio/offset", data="offset", content_type="text/plain")
+    assert response.status_code == 200
+    assert response.get_json()["offset_ms"] == 150
+
+
+def test_servo_defaults_to_channel_zero(make_client):
+    response = make_client().post("/servo", data="{bad json", content_type="application/json")
+    assert response.status_code == 200
+    assert response.get_json()["channel"] == 0
+
+
+def test_routes_reject_json_that_is_not_an_object(make_client):
+    client = make_client()
+    assert client.post("/servo", json=[0, 1200]).status_code == 400
+    assert client.post("/audio/offset", json=300).status_code == 400
+    assert client.post("/config", json="numServos").status_code == 400
+
+
+def test_status_etag_changes_across_app_instances(make_client):
+    first = make_client().get("/status").headers["ETag"]
+    # Same state in a fresh app (as after a restart) must not revalidate
+    again = make_client().get("/status", headers={"If-None-Match": first})
+    assert again.status_code == 200
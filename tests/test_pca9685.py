@@ -0,0 +1,86 @@
+"""Tests for the PCA9685 register-level writes."""
+
+import socket
+
+import pytest
+
+from droidrig.hardware import pca9685
+from droidrig.hardware.pca9685 import PCA9685
+
+MODE1 = 0x00
+LED0_ON_L = 0x06
+
+
+@pytest.fixture
+def pwm(monkeypatch):
+    """A PCA9685 whose fd is one end of a SEQPACKET pair, not /dev/i2c-N.
+
+    Each os.write() arrives as its own packet, so the test sees the I2C
+    transactions exactly as they'd be sent to i2c-dev.
+    """
+    driver_end, test_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    test_end.setblocking(False)
+    fd = driver_end.detach()
+    # os.open is the real module attribute, so only patch it for __init__
+    with monkeypatch.context() as m:
+        m.setattr(pca9685.os, "open", lambda path, flags: fd)
+        m.setattr(pca9685.fcntl, "ioctl", lambda fd, request, arg: 0)
+        driver = PCA9685()
+
+    def transactions():
+        packets = []
+        while True:
+            try:
+                packets.append(test_end.recv(256))
+            except BlockingIOError:
+                return packets
+
+    driver.transactions = transactions
+    # Keep the start-up writes apart from what each test sends
+    driver.init_transactions = transactions()
+    yield driver
+    driver.close()
+    test_end.close()
+
+
+def channel_bytes(off: int) -> list:
+    return [0, 0, off & 0xFF, off >> 8]
+
+
+def test_init_enables_auto_increment(pwm):
+    assert pwm.init_transactions == [bytes([MODE1, PCA9685._AI])]
+
+
+def test_contiguous_channels_are_one_block_write(pwm):
+    pwm.set_pwm_multi({2: 300, 0: 100, 1: 0x1FF})
+
+    assert pwm.transactions() == [
+        bytes([LED0_ON_L, *channel_bytes(100), *channel_bytes(0x1FF), *channel_bytes(300)]),
+    ]
+
+
+def test_gaps_split_into_one_write_per_run(pwm):
+    pwm.set_pwm_multi({0: 100, 1: 200, 5: 500, 6: 600, 15: 4095})
+
+    assert pwm.transactions() == [
+        bytes([LED0_ON_L, *channel_bytes(100), *channel_bytes(200)]),
+        bytes([LED0_ON_L + 4 * 5, *channel_bytes(500), *channel_bytes(600)]),
+        bytes([LED0_ON_L + 4 * 15, *channel_bytes(4095)]),
+    ]
+
+
+def test_single_channel(pwm):
+    pwm.set_pwm_multi({3: 307})
+    pwm.set_pwm(7, 0, 410)
+
+    assert pwm.transactions() == [
+        bytes([LED0_ON_L + 4 * 3, *channel_bytes(307)]),
+        bytes([LED0_ON_L + 4 * 7, *channel_bytes(410)]),
+    ]
+
+
+def test_all_channels_fit_one_transaction(pwm):
+    pwm.set_servo_pulses({ch: 1500 for ch in range(16)})
+
+    (packet,) = pwm.transactions()
+    assert packet == bytes([LED0_ON_L, *channel_bytes(1500 * 4096 // 20000) * 16])
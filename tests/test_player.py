@@ -0,0 +1,38 @@
+"""Tests for the audio player's file bookkeeping."""
+
+import orjson
+
+from droidrig.audio.player import DURATION_CACHE_FILENAME, AudioPlayer
+
+
+def test_listing_prunes_durations_of_removed_files(tmp_path):
+    clip = tmp_path / "clip.wav"
+    clip.write_bytes(b"RIFF")
+    st = clip.stat()
+    cache_path = tmp_path / DURATION_CACHE_FILENAME
+    cache_path.write_bytes(orjson.dumps({
+        "clip.wav": [st.st_size, st.st_mtime_ns, 1234],
+        "renamed.wav": [10, 20, 5678],
+    }))
+
+    player = AudioPlayer(audio_dir=tmp_path)
+    assert [f["name"] for f in player.list_audio_files()] == ["clip.wav"]
+
+    assert orjson.loads(cache_path.read_bytes()) == {
+        "clip.wav": [st.st_size, st.st_mtime_ns, 1234],
+    }
+
+
+def test_unreadable_waveform_is_cached(tmp_path, monkeypatch):
+    clip = tmp_path / "broken.wav"
+    clip.write_bytes(b"not a wav file")
+    player = AudioPlayer(audio_dir=tmp_path)
+
+    first = player.get_waveform_data(clip, 50)
+    assert len(first) == 50
+
+    def fail(*args):
+        raise AssertionError("decoded again")
+
+    monkeypatch.setattr(player, "_extract_waveform", fail)
+    assert player.get_waveform_data(clip, 50) == first
@@ -0,0 +1,19 @@
+"""Tests for the servo controller."""
+
+from droidrig.config import MAX_PULSE
+
+
+def test_set_positions_drops_out_of_range_channels(make_servo):
+    servo = make_servo()
+    servo.pwm.writes.clear()
+
+    applied = servo.set_positions({0: 1600, 16: 1700, -1: 1800})
+
+    assert applied == {0: 1600}
+    assert servo.pwm.writes == [{0: 1600}]
+    assert 15 not in servo.get_all_positions()
+
+
+def test_set_positions_clamps_to_limits(make_servo):
+    servo = make_servo()
+    assert servo.set_positions({1: MAX_PULSE + 500}) == {1: MAX_PULSE}
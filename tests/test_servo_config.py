@@ -0,0 +1,41 @@
+"""Tests for the persistent servo configuration store."""
+
+import json
+import time
+
+from droidrig import servo_config as servo_config_module
+from droidrig.servo_config import ServoConfigStore
+
+
+def test_failed_debounced_save_is_retried(monkeypatch, tmp_path):
+    monkeypatch.setattr(servo_config_module, "SAVE_DEBOUNCE_SEC", 0.01)
+    path = tmp_path / "servo_config.json"
+    store = ServoConfigStore(num_servos=2, _config_path=path)
+
+    real_save = store.save
+    calls = []
+
+    def flaky_save(path=None):
+        calls.append(path)
+        if len(calls) == 1:
+            raise RuntimeError("disk went away")
+        real_save(path)
+
+    monkeypatch.setattr(store, "save", flaky_save)
+    store.set_num_servos(3)
+    store.mark_dirty()
+
+    deadline = time.monotonic() + 2
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(calls) == 2
+    assert json.loads(path.read_text())["num_servos"] == 3
+
+
+def test_mark_dirty_without_path_schedules_nothing(capsys):
+    store = ServoConfigStore(num_servos=2)
+    store.mark_dirty()
+
+    assert store._save_timer is None
+    assert capsys.readouterr().out == ""
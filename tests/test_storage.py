@@ -0,0 +1,59 @@
+"""Tests for the animation store and its metadata index."""
+
+import os
+import threading
+
+import orjson
+
+from droidrig.animation.storage import AnimationStore, SavedAnimation
+
+
+def test_list_all_picks_up_files_edited_in_place(tmp_path):
+    store = AnimationStore(storage_dir=tmp_path)
+    path = store.save(SavedAnimation(name="Wave", duration_ms=1000, curves={}))
+    assert store.list_all()[0]["duration_ms"] == 1000
+
+    # Rewrite the file behind the store's back, as an editor or copy would
+    data = orjson.loads(path.read_bytes())
+    data["duration_ms"] = 2500
+    path.write_bytes(orjson.dumps(data))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert store.list_all()[0]["duration_ms"] == 2500
+    # A fresh store trusts the index only while the stat key matches
+    assert AnimationStore(storage_dir=tmp_path).list_all()[0]["duration_ms"] == 2500
+
+
+def test_list_all_tracks_added_and_removed_files(tmp_path):
+    store = AnimationStore(storage_dir=tmp_path)
+    store.save(SavedAnimation(name="One", duration_ms=100, curves={}))
+    assert [a["filename"] for a in store.list_all()] == ["one"]
+
+    (tmp_path / "two.json").write_bytes(orjson.dumps({"name": "Two", "duration_ms": 200}))
+    (tmp_path / "one.json").unlink()
+
+    assert [a["name"] for a in store.list_all()] == ["Two"]
+
+
+def test_concurrent_saves_of_one_animation(tmp_path):
+    store = AnimationStore(storage_dir=tmp_path)
+    errors = []
+
+    def save(duration_ms):
+        try:
+            for _ in range(20):
+                store.save(SavedAnimation(name="Busy", duration_ms=duration_ms, curves={}))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(ms,)) for ms in (100, 200, 300, 400)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    saved = store.list_all()
+    assert len(saved) == 1
+    assert store.load("Busy").duration_ms == saved[0]["duration_ms"]